@@ -0,0 +1,585 @@
+"""Benchmarks for the thumbnailing and listing paths of player.py.
+
+Builds synthetic camera trees with ffmpeg's ``testsrc`` and times how the
+app scans them, renders thumbnails, populates its thumbnail views and lays
+out the grid. Results are written as JSON so two runs can be compared:
+
+    python benchmark.py generate /tmp/camtree --branches 2 --cameras 8 --clips 500
+    python benchmark.py run /tmp/camtree --output before.json
+    python benchmark.py run /tmp/camtree --output after.json
+    python benchmark.py compare before.json after.json
+
+``--latency 5`` makes every listing and stat wait 5 ms first, which is
+roughly what a camera root on a network share costs.
+
+Qt runs on the offscreen platform and every cache the app or a benchmark
+writes goes to one temporary directory that is removed on exit, so a run
+leaves nothing behind. Generated trees stay where they were asked for.
+"""
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# keep the app's caches out of the user's home, fresh for every run
+SCRATCH_DIR = tempfile.mkdtemp(prefix='remote_cam_bench_')
+atexit.register(shutil.rmtree, SCRATCH_DIR, ignore_errors=True)
+os.environ['REMOTE_CAM_CACHE_DIR'] = os.path.join(SCRATCH_DIR, 'cache')
+
+import ffmpeg
+from PyQt6 import QtCore
+from PyQt6.QtCore import QPoint, QRect, QSize, Qt, pyqtSignal
+from PyQt6.QtWidgets import (
+    QApplication, QLabel, QLayout, QListView, QSizePolicy, QSpacerItem, QWidget
+)
+
+import player
+
+# extension of the generated clips
+CLIP_EXTENSION = '.mp4'
+
+
+# the grid's layout before ThumbnailView, kept as the baseline of the
+# layout stage
+class FlowLayout(QLayout):
+    """A ``QLayout`` that aranges its child widgets horizontally and
+    vertically.
+
+    If enough horizontal space is available, it looks like an ``HBoxLayout``,
+    but if enough space is lacking, it automatically wraps its children into
+    multiple rows.
+
+    Thanks largely to stackoverflow.
+
+    """
+    heightChanged = pyqtSignal(int)
+
+    def __init__(self, parent=None, margin=0, spacing=-1):
+        super().__init__(parent)
+        if parent is not None:
+            self.setContentsMargins(margin, margin, margin, margin)
+        self.setSpacing(spacing)
+
+        self._item_list = []
+
+    def __del__(self):
+        while self.count():
+            self.takeAt(0)
+
+    def addItem(self, item):  # pylint: disable=invalid-name
+        self._item_list.append(item)
+
+    def addSpacing(self, size):  # pylint: disable=invalid-name
+        self.addItem(QSpacerItem(size, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
+
+    def count(self):
+        return len(self._item_list)
+
+    def itemAt(self, index):  # pylint: disable=invalid-name
+        if 0 <= index < len(self._item_list):
+            return self._item_list[index]
+        return None
+
+    def takeAt(self, index):  # pylint: disable=invalid-name
+        if 0 <= index < len(self._item_list):
+            return self._item_list.pop(index)
+        return None
+
+    def expandingDirections(self):  # pylint: disable=invalid-name,no-self-use
+        return Qt.Orientations(Qt.Orientation(0))
+
+    def hasHeightForWidth(self):  # pylint: disable=invalid-name,no-self-use
+        return True
+
+    def heightForWidth(self, width):  # pylint: disable=invalid-name
+        height = self._do_layout(QRect(0, 0, width, 0), True)
+        return height
+
+    def setGeometry(self, rect):  # pylint: disable=invalid-name
+        super().setGeometry(rect)
+        self._do_layout(rect, False)
+
+    def sizeHint(self):  # pylint: disable=invalid-name
+        return self.minimumSize()
+
+    def minimumSize(self):  # pylint: disable=invalid-name
+        size = QSize()
+
+        for item in self._item_list:
+            minsize = item.minimumSize()
+            extent = item.geometry().bottomRight()
+            size = size.expandedTo(QSize(minsize.width(), extent.y()))
+
+        margin = self.contentsMargins().left()
+        size += QSize(2 * margin, 2 * margin)
+        return size
+
+    def _do_layout(self, rect, test_only=False):
+        m = self.contentsMargins()
+        effective_rect = rect.adjusted(+m.left(), +m.top(), -m.right(), -m.bottom())
+        x = effective_rect.x()
+        y = effective_rect.y()
+        line_height = 0
+
+        for item in self._item_list:
+            wid = item.widget()
+
+            space_x = self.spacing()
+            space_y = self.spacing()
+            if wid is not None:
+                space_x += wid.style().layoutSpacing(
+                    QSizePolicy.ControlTypes.PushButton, QSizePolicy.ControlTypes.PushButton, Qt.Orientations.Horizontal)
+                space_y += wid.style().layoutSpacing(
+                    QSizePolicy.ControlTypes.PushButton, QSizePolicy.ControlTypes.PushButton, Qt.Orientations.Vertical)
+
+            next_x = x + item.sizeHint().width() + space_x
+            if next_x - space_x > effective_rect.right() and line_height > 0:
+                x = effective_rect.x()
+                y = y + line_height + space_y
+                next_x = x + item.sizeHint().width() + space_x
+                line_height = 0
+
+            if not test_only:
+                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+
+            x = next_x
+            line_height = max(line_height, item.sizeHint().height())
+
+        new_height = y + line_height - rect.y()
+        self.heightChanged.emit(new_height)
+        return new_height
+
+
+def scratch_dir(prefix):
+    """Return a new empty directory that goes away with SCRATCH_DIR."""
+    return tempfile.mkdtemp(prefix=prefix, dir=SCRATCH_DIR)
+
+
+def generate_tree(root, branches=2, cameras=4, clips=100, clip_seconds=2,
+                  size='320x240', unique=False):
+    """Create ``branches`` folders of ``cameras`` camera folders holding
+    ``clips`` recordings each. Unless ``unique``, one clip per camera is
+    encoded and copied, which is much faster and scans the same."""
+    os.makedirs(root, exist_ok=True)
+    template = None
+    for branch in range(branches):
+        for camera in range(cameras):
+            folder = os.path.join(root, f'branch{branch:02d}', f'camera{camera:02d}')
+            os.makedirs(folder, exist_ok=True)
+            for clip in range(clips):
+                path = os.path.join(folder, f'{clip:06d}{CLIP_EXTENSION}')
+                if os.path.exists(path):
+                    continue
+                if unique or template is None:
+                    (
+                        ffmpeg
+                        .input(f'testsrc=size={size}:rate=15', f='lavfi', t=clip_seconds)
+                        .output(path, vcodec='libx264', preset='ultrafast',
+                                pix_fmt='yuv420p', g=15)
+                        .global_args('-loglevel', 'error')
+                        .run(overwrite_output=True)
+                    )
+                    template = template or path
+                else:
+                    shutil.copyfile(template, path)
+    return tree_stats(root)
+
+
+def tree_stats(root):
+    branches = cameras = clips = 0
+    for branch in os.scandir(root):
+        if not branch.is_dir():
+            continue
+        branches += 1
+        for camera in os.scandir(branch.path):
+            if camera.is_dir():
+                cameras += 1
+                clips += sum(1 for entry in os.scandir(camera.path) if entry.is_file())
+    return {'branches': branches, 'cameras': cameras, 'clips': clips}
+
+
+def cameras_of(root):
+    return sorted(
+        camera.path
+        for branch in os.scandir(root) if branch.is_dir()
+        for camera in os.scandir(branch.path) if camera.is_dir()
+    )
+
+
+class SlowEntry:
+    """An ``os.DirEntry`` whose stat takes a round trip the first time, its
+    type is known from the listing as on NFS and SMB."""
+    def __init__(self, entry, delay):
+        self._entry = entry
+        self._delay = delay
+        self._stat = None
+        self.name = entry.name
+        self.path = entry.path
+
+    def __fspath__(self):
+        return self.path
+
+    def __repr__(self):
+        return f'<SlowEntry {self.name!r}>'
+
+    def is_dir(self, *, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def is_file(self, *, follow_symlinks=True):
+        return self._entry.is_file(follow_symlinks=follow_symlinks)
+
+    def is_symlink(self):
+        return self._entry.is_symlink()
+
+    def inode(self):
+        return self._entry.inode()
+
+    def stat(self, *, follow_symlinks=True):
+        if self._stat is None:
+            time.sleep(self._delay)
+            self._stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return self._stat
+
+
+class SlowListing:
+    """``os.scandir`` over a share, a round trip per ``batch`` entries."""
+    def __init__(self, listing, delay, batch):
+        self._listing = listing
+        self._delay = delay
+        self._batch = batch
+        self._read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._read % self._batch == 0:
+            time.sleep(self._delay)
+        self._read += 1
+        return SlowEntry(next(self._listing), self._delay)
+
+    def close(self):
+        self._listing.close()
+
+
+def add_latency(seconds, batch=64):
+    """Make ``os.scandir`` and ``os.stat`` (and so ``os.path.getctime`` and
+    friends) wait ``seconds`` per request from now on."""
+    scandir, stat = os.scandir, os.stat
+
+    def slow_scandir(path='.'):
+        time.sleep(seconds)
+        return SlowListing(scandir(path), seconds, batch)
+
+    def slow_stat(path, *args, **kwargs):
+        time.sleep(seconds)
+        return stat(path, *args, **kwargs)
+    os.scandir = slow_scandir
+    os.stat = slow_stat
+
+
+def timed(function, repeat):
+    """Call ``function`` ``repeat`` times, return the wall times in seconds."""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        runs.append(time.perf_counter() - start)
+    return runs
+
+
+def summary(runs, **extra):
+    result = {
+        'median': statistics.median(runs), 'min': min(runs), 'max': max(runs),
+        'runs': runs, 'unit': 's'
+    }
+    result.update(extra)
+    return result
+
+
+def wait_for(app, condition, timeout):
+    end = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end:
+            raise TimeoutError('condition not met within %ss' % timeout)
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def bench_scan(root, repeat):
+    cameras = cameras_of(root)
+    branches = sorted(entry.path for entry in os.scandir(root) if entry.is_dir())
+    results = {}
+
+    def list_cameras():
+        for branch in branches:
+            thread = player.ThumbnailThread(branch, player.CancelToken())
+            thread.run()
+
+    def media_lists():
+        for camera in cameras:
+            for _ in player.generate_media_list(camera):
+                pass
+
+    def first_cameras():
+        # until the grid has something to show, not until the listing ends
+        waits = []
+        for branch in branches:
+            thread = player.ThumbnailThread(branch, player.CancelToken())
+            start = time.perf_counter()
+            first = []
+
+            def record(*args):
+                if not first:
+                    first.append(time.perf_counter() - start)
+            thread.found.connect(record)
+            thread.update_widget.connect(record)
+            thread.run()
+            waits.extend(first)
+        return waits
+
+    results['scan.list_cameras'] = summary(timed(list_cameras, repeat), items=len(branches))
+    results['scan.first_cameras'] = summary(
+        [wait for _ in range(repeat) for wait in first_cameras()], items=len(branches)
+    )
+    results['scan.tree_folders'] = summary(
+        timed(lambda: [player.list_subdirectories(branch) for branch in branches], repeat),
+        items=len(branches)
+    )
+    results['scan.branch_index'] = summary(
+        timed(lambda: player.BranchIndex.build(root), repeat), items=len(cameras)
+    )
+    results['scan.generate_media_list'] = summary(timed(media_lists, repeat), items=len(cameras))
+    catalog_path = os.path.join(scratch_dir('catalog_'), 'catalog.sqlite3')
+    catalog = player.RecordingCatalog(catalog_path)
+    results['scan.catalog_cold'] = summary(
+        timed(lambda: [catalog.refresh(camera) for camera in cameras], 1), items=len(cameras)
+    )
+    results['scan.catalog_warm'] = summary(
+        timed(lambda: [catalog.refresh(camera) for camera in cameras], repeat), items=len(cameras)
+    )
+    results['scan.catalog_media_list'] = summary(timed(
+        lambda: [list(player.generate_media_list(camera, catalog=catalog)) for camera in cameras],
+        repeat
+    ), items=len(cameras))
+    return results
+
+
+def bench_thumbnails(root, count):
+    clips = [
+        entry.path for camera in cameras_of(root) for entry in sorted(
+            os.scandir(camera), key=lambda entry: entry.name
+        )[:1]
+    ][:count]
+    results = {}
+    for fast in (True, False):
+        mode = 'fast' if fast else 'full'
+        cache = player.ThumbnailCache(scratch_dir('thumbs_'))
+        cold = timed(
+            lambda: [player.generate_thumbnail(clip, cache, fast=fast) for clip in clips], 1
+        )
+        warm = timed(
+            lambda: [player.generate_thumbnail(clip, cache, fast=fast) for clip in clips], 1
+        )
+        results[f'thumbnail.{mode}_cold'] = summary(
+            cold, items=len(clips), per_item=cold[0] / max(len(clips), 1)
+        )
+        results[f'thumbnail.{mode}_cached'] = summary(
+            warm, items=len(clips), per_item=warm[0] / max(len(clips), 1)
+        )
+    return results
+
+
+def bench_views(app, root, repeat, timeout):
+    """Time until the strip of the largest camera shows its thumbnails and
+    until a grid of every camera is laid out."""
+    cameras = cameras_of(root)
+    camera = max(cameras, key=lambda path: len(os.listdir(path)))
+    videos = list(player.generate_media_list(camera))
+    cache = player.ThumbnailCache(scratch_dir('views_'))
+    pool = player.ThumbnailPool(cache)
+    results = {}
+
+    def populate():
+        model = player.ThumbnailListModel(pool)
+        view = player.ThumbnailView()
+        view.setFlow(QListView.Flow.LeftToRight)
+        view.setWrapping(False)
+        view.setModel(model)
+        view.resize(900, 160)
+        view.show()
+        model.reset(player.CancelToken(), [(video, os.path.basename(video)) for video in videos])
+
+        def visible_ready():
+            rows = view.visible_rows()
+            return rows is not None and all(
+                model.data(model.index(row, 0), model.StateRole) != model.PENDING
+                for row in range(rows[0], rows[1] + 1)
+            )
+        wait_for(app, visible_ready, timeout)
+        view.close()
+
+    populate()  # the first round renders, the rest measure cached thumbnails
+    results['view.strip_visible_cold'] = summary(timed(populate, 1), items=len(videos))
+    results['view.strip_visible_cached'] = summary(timed(populate, repeat), items=len(videos))
+    pool.shutdown()
+    return results
+
+
+def bench_layout(app, count, repeat):
+    """Compare the old widget-per-camera FlowLayout with the model grid."""
+    results = {}
+    container = QWidget()
+    layout = FlowLayout(container)
+    for number in range(count):
+        label = QLabel(f'camera {number}')
+        label.setFixedSize(*player.THUMBNAIL_SIZE)
+        layout.addWidget(label)
+    rect = QtCore.QRect(0, 0, 900, 900)
+    results['layout.flow'] = summary(
+        timed(lambda: layout._do_layout(rect, False), repeat), items=count
+    )
+    model = player.ThumbnailListModel(player.ThumbnailPool(player.ThumbnailCache(
+        scratch_dir('layout_'))))
+    view = player.ThumbnailView(caption=True)
+    view.setFlow(QListView.Flow.LeftToRight)
+    view.setWrapping(True)
+    view.setResizeMode(QListView.ResizeMode.Adjust)
+    view.setModel(model)
+    view.resize(900, 900)
+    view.show()
+    rows = [(f'camera{number}', f'camera {number}') for number in range(count)]
+
+    def grid():
+        model.reset(player.CancelToken(), rows)
+        view.doItemsLayout()
+        app.processEvents()
+    results['layout.grid_view'] = summary(timed(grid, repeat), items=count)
+    view.close()
+    return results
+
+
+def run(args):
+    app = QApplication.instance() or QApplication([])
+    results = {}
+    stats = tree_stats(args.root)
+    if args.latency:
+        add_latency(args.latency / 1000)
+    stages = set(args.only or ('scan', 'thumbnails', 'views', 'layout'))
+    if 'scan' in stages:
+        results.update(bench_scan(args.root, args.repeat))
+    if 'thumbnails' in stages:
+        results.update(bench_thumbnails(args.root, args.thumbnails))
+    if 'views' in stages:
+        results.update(bench_views(app, args.root, args.repeat, args.timeout))
+    if 'layout' in stages:
+        results.update(bench_layout(app, args.layout_items, args.repeat))
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'qt': QtCore.QT_VERSION_STR,
+            'cpus': os.cpu_count(),
+            'thumbnail_workers': player.THUMBNAIL_WORKERS,
+            'tree': stats,
+            'latency_ms': args.latency,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    for name, result in sorted(results.items()):
+        print(f"{name:32} {result['median'] * 1000:10.2f} ms")
+    return 0
+
+
+def compare(args):
+    """Print old vs new medians, exit 1 when something got slower than
+    ``threshold`` allows."""
+    with open(args.old) as f:
+        old = json.load(f)['results']
+    with open(args.new) as f:
+        new = json.load(f)['results']
+    regressions = 0
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            print(f"{name:32} {'only in ' + ('new' if name in new else 'old'):>30}")
+            continue
+        before, after = old[name]['median'], new[name]['median']
+        ratio = after / before if before else float('inf')
+        flag = ''
+        if ratio > 1 + args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = '  faster'
+        print(f"{name:32} {before * 1000:10.2f} ms -> {after * 1000:10.2f} ms  x{ratio:5.2f}{flag}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='build a synthetic camera tree')
+    generate.add_argument('root')
+    generate.add_argument('--branches', type=int, default=2)
+    generate.add_argument('--cameras', type=int, default=4, help='cameras per branch')
+    generate.add_argument('--clips', type=int, default=100, help='recordings per camera')
+    generate.add_argument('--clip-seconds', type=float, default=2)
+    generate.add_argument('--size', default='320x240')
+    generate.add_argument('--unique', action='store_true',
+                          help='encode every clip instead of copying one per tree')
+
+    bench = commands.add_parser('run', help='time a camera tree')
+    bench.add_argument('root')
+    bench.add_argument('--output', '-o', help='write the results as JSON')
+    bench.add_argument('--repeat', type=int, default=5)
+    bench.add_argument('--thumbnails', type=int, default=20,
+                       help='recordings to thumbnail, cold and cached')
+    bench.add_argument('--layout-items', type=int, default=2000)
+    bench.add_argument('--timeout', type=float, default=120,
+                       help='seconds to wait for a view to fill')
+    bench.add_argument('--latency', type=float, default=0,
+                       help='milliseconds added to every listing and stat, '
+                            'to stand in for a network share')
+    bench.add_argument('--only', action='append',
+                       choices=('scan', 'thumbnails', 'views', 'layout'))
+
+    diff = commands.add_parser('compare', help='compare two result files')
+    diff.add_argument('old')
+    diff.add_argument('new')
+    diff.add_argument('--threshold', type=float, default=0.10,
+                      help='relative change reported as a regression')
+
+    args = parser.parse_args(argv)
+    if args.command == 'generate':
+        print(json.dumps(generate_tree(
+            args.root, args.branches, args.cameras, args.clips,
+            args.clip_seconds, args.size, args.unique
+        )))
+        return 0
+    if args.command == 'run':
+        return run(args)
+    return compare(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,305 +1,3132 @@
 from PyQt6.QtCore import (
     QPoint, QRect, QSize, Qt,
-    pyqtSignal, QAbstractListModel,
-    QModelIndex, QTimer, QThread, QDir, QRect
+    pyqtSignal, QAbstractListModel, QAbstractItemModel,
+    QModelIndex, QTimer, QThread, QRect,
+    QObject, QFileSystemWatcher, QDate, QTime, QDateTime,
+    QStringListModel
 )
 from PyQt6.QtWidgets import (
     QFrame, QGridLayout, QHBoxLayout,
-    QLabel, QLayout, QPushButton, QSizePolicy,
-    QSpacerItem, QVBoxLayout, QWidget,
+    QLabel, QPushButton,
+    QVBoxLayout, QWidget,
     QTreeView, QLineEdit,
     QListView, QStackedWidget, QSlider,
-    QDateEdit, QListWidget, QListWidgetItem,
-    QToolBar
+    QDateEdit, QToolBar, QStyledItemDelegate,
+    QStyle, QTimeEdit, QDateTimeEdit, QDialog, QDialogButtonBox,
+    QFormLayout, QListWidget, QListWidgetItem, QDockWidget
 )
 from random import choice, randint
 from PyQt6 import QtGui, QtWidgets
 import sys
-from time import sleep
-from functools import partial
+import time
+from functools import partial, wraps, lru_cache
+from contextlib import contextmanager
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from PyQt6.QtGui import (
-    QIcon, QPixmap, QFileSystemModel,
-    QAction
+    QIcon, QPixmap,
+    QAction, QColor, QPen, QPainter
 )
 import os
-import vlc
+import hashlib
+import itertools
+import heapq
+import json
+import re
+import argparse
+import csv
+import sqlite3
+import subprocess
 import tempfile
-import ffmpeg
+import threading
+import importlib
+import importlib.util
 
-class FlowLayout(QLayout):
-    """A ``QLayout`` that aranges its child widgets horizontally and
-    vertically.
 
-    If enough horizontal space is available, it looks like an ``HBoxLayout``,
-    but if enough space is lacking, it automatically wraps its children into
-    multiple rows.
+class _LazyModule:
+    """Stands in for a module that is only imported when first used, so
+    libvlc, ffmpeg-python and numpy don't delay the first window."""
+    def __init__(self, name):
+        self._name = name
+        self._module = None
 
-    Thanks largely to stackoverflow.
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
 
+
+vlc = _LazyModule('vlc')
+ffmpeg = _LazyModule('ffmpeg')
+# without numpy recordings are just not analysed for activity
+np = _LazyModule('numpy')
+HAVE_NUMPY = importlib.util.find_spec('numpy') is not None
+
+# where generated artefacts (thumbnails etc.) are kept between runs
+CACHE_DIR = os.environ.get(
+    'REMOTE_CAM_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.remote_cam_controller')
+)
+THUMBNAIL_CACHE_DIR = os.path.join(CACHE_DIR, 'thumbnails')
+# what was open when the app was last closed
+SESSION_PATH = os.path.join(CACHE_DIR, 'session.json')
+# local index of cameras and their recordings
+CATALOG_PATH = os.path.join(CACHE_DIR, 'catalog.sqlite3')
+# byte budget of the thumbnail cache, least recently used entries go first
+THUMBNAIL_CACHE_BYTES = int(os.environ.get('REMOTE_CAM_THUMBNAIL_CACHE_BYTES', 256 * 1024 * 1024))
+# size thumbnails are displayed at
+THUMBNAIL_SIZE = (111, 111)
+# render thumbnails straight at THUMBNAIL_SIZE from the nearest keyframe
+# instead of decoding the exact midpoint at full resolution
+FAST_THUMBNAILS = os.environ.get('REMOTE_CAM_FAST_THUMBNAILS', '1') != '0'
+# where fast thumbnails are taken from when the clip length is not known
+FAST_THUMBNAIL_OFFSET = 2.0
+# decoded thumbnails kept in memory per view, older ones are reloaded from disk
+PIXMAP_CACHE_ITEMS = 512
+# storyboards tile this many evenly spaced frames of a recording into one
+# image, (columns, rows), each frame scaled to STORYBOARD_TILE_SIZE
+STORYBOARD_TILES = (10, 10)
+STORYBOARD_TILE_SIZE = (160, 90)
+# activity analysis samples MOTION_FPS frames a second, scaled down to
+# MOTION_SIZE grey pixels; a pixel whose grey level moves by more than
+# MOTION_PIXEL_THRESHOLD counts as changed
+MOTION_FPS = 4
+MOTION_SIZE = (64, 36)
+MOTION_PIXEL_THRESHOLD = 12
+# per second activity scores (0-255) from which on a second is an event
+MOTION_EVENT_THRESHOLD = 32
+# assumed length of a recording whose duration has not been probed yet
+SEGMENT_SECONDS = 300
+# mosaic playback: at most this many tiles, re-seeked when they drift more
+# than MOSAIC_MAX_DRIFT seconds from the wall clock
+MOSAIC_MAX_TILES = 16
+MOSAIC_MAX_DRIFT = 1.0
+# libvlc options that lighten decoding of the tiles that are not focused:
+# drop non-reference frames and the deblocking filter, decode on one thread
+# and leave the audio out
+MOSAIC_BACKGROUND_OPTIONS = (
+    ':avcodec-skip-frame=1', ':avcodec-skiploopfilter=4',
+    ':avcodec-threads=1', ':avcodec-hurry-up', ':no-audio'
+)
+# playback rates the speed button steps through
+REVIEW_RATES = (1, 2, 4, 8, 16, 32)
+# decoder options from a playback rate on: from 4x B-frames and the
+# deblocking filter are skipped, from 16x only keyframes are decoded, audio
+# is left out either way
+REVIEW_DECODE_OPTIONS = (
+    (16, (':avcodec-skip-frame=3', ':avcodec-skiploopfilter=4', ':avcodec-hurry-up', ':no-audio')),
+    (4, (':avcodec-skip-frame=1', ':avcodec-skiploopfilter=4', ':avcodec-hurry-up', ':no-audio')),
+)
+# seconds an ffprobe run, a single frame ffmpeg run and an ffmpeg pass over
+# a whole recording (storyboard, activity) may take before being killed
+FFPROBE_TIMEOUT = 20
+FFMPEG_TIMEOUT = 60
+FFMPEG_PASS_TIMEOUT = 900
+# a recording that failed to decode is left alone for FAILURE_RETRY_SECONDS,
+# doubling with every further failure up to FAILURE_RETRY_MAX_SECONDS
+FAILURE_RETRY_SECONDS = 15 * 60
+FAILURE_RETRY_MAX_SECONDS = 7 * 24 * 3600
+# entries of a folder looked at to tell whether the tree should offer to
+# expand it, camera folders hold thousands of files and no folders
+TREE_PEEK_ENTRIES = 256
+# listings and stats in flight at once per mount; a network share answers
+# each request slowly but serves several of them in parallel
+SCAN_CONCURRENCY_PER_MOUNT = int(os.environ.get('REMOTE_CAM_SCAN_CONCURRENCY', 8))
+# threads issuing those requests, shared by every mount
+SCAN_WORKERS = 32
+# seconds between batches of cameras handed to the grid while listing a folder
+SCAN_BATCH_SECONDS = 0.1
+# exports that run at the same time, each one is mostly disk I/O
+EXPORT_WORKERS = 2
+# ffmpeg muxers of export file extensions that are not named after one
+EXPORT_FORMATS = {'mkv': 'matroska', 'ts': 'mpegts', 'm4v': 'mp4', 'mpg': 'mpeg'}
+# how many thumbnails are rendered at the same time
+THUMBNAIL_WORKERS = int(os.environ.get('REMOTE_CAM_THUMBNAIL_WORKERS', os.cpu_count() or 4))
+# timing spans and counters, REMOTE_CAM_METRICS=0 turns them into no-ops
+METRICS_ENABLED = os.environ.get('REMOTE_CAM_METRICS', '1') != '0'
+
+
+class Metrics:
+    """Process wide timing histograms, counters and gauges.
+
+    A span costs two clock reads and a dict update under a lock; durations
+    land in power-of-two microsecond buckets, so memory stays constant no
+    matter how long the app runs and percentiles are good to a factor of two.
+    """
+    def __init__(self, enabled=METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # name -> [count, total seconds, max seconds, {bucket: count}]
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    @contextmanager
+    def span(self, name):
+        """Time the ``with`` block into the histogram ``name``."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name):
+        """Decorator timing every call of a function into ``name``."""
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def observe(self, name, seconds):
+        if not self.enabled:
+            return
+        bucket = int(seconds * 1000000).bit_length()
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = [0, 0.0, 0.0, {}]
+            histogram[0] += 1
+            histogram[1] += seconds
+            histogram[2] = max(histogram[2], seconds)
+            histogram[3][bucket] = histogram[3].get(bucket, 0) + 1
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def adjust(self, name, delta):
+        """Move the gauge ``name``, e.g. a queue depth, by ``delta``."""
+        if self.enabled:
+            with self._lock:
+                self._gauges[name] = self._gauges.get(name, 0) + delta
+
+    @staticmethod
+    def _percentile(buckets, count, fraction):
+        # upper bound of the bucket holding the requested rank
+        rank = fraction * count
+        seen = 0
+        for bucket in sorted(buckets):
+            seen += buckets[bucket]
+            if seen >= rank:
+                return (1 << bucket) / 1000000
+        return 0.0
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {
+                name: (count, total, peak, dict(buckets))
+                for name, (count, total, peak, buckets) in self._histograms.items()
+            }
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        return {
+            'histograms': {
+                name: {
+                    'count': count, 'total': total, 'mean': total / count, 'max': peak,
+                    'p50': min(self._percentile(buckets, count, 0.5), peak),
+                    'p95': min(self._percentile(buckets, count, 0.95), peak),
+                    'buckets_us': {str(1 << bucket): n for bucket, n in sorted(buckets.items())},
+                }
+                for name, (count, total, peak, buckets) in sorted(histograms.items())
+            },
+            'counters': counters,
+            'gauges': gauges,
+        }
+
+    def dump(self, path):
+        """Write a snapshot to ``path``, as CSV if it ends in .csv else JSON."""
+        snapshot = self.snapshot()
+        with open(path, 'w', newline='') as f:
+            if not path.lower().endswith('.csv'):
+                json.dump(snapshot, f, indent=2)
+                return
+            writer = csv.writer(f)
+            writer.writerow(['kind', 'name', 'count', 'total', 'mean', 'p50', 'p95', 'max', 'value'])
+            for name, h in snapshot['histograms'].items():
+                writer.writerow(['histogram', name, h['count'], h['total'], h['mean'],
+                                 h['p50'], h['p95'], h['max'], ''])
+            for kind in ('counters', 'gauges'):
+                for name, value in sorted(snapshot[kind].items()):
+                    writer.writerow([kind[:-1], name, '', '', '', '', '', '', value])
+
+    def report(self):
+        """Return a snapshot as a short fixed-width table."""
+        snapshot = self.snapshot()
+        lines = ['%-24s %6s %8s %8s %8s' % ('stage', 'n', 'p50 ms', 'p95 ms', 'max ms')]
+        for name, h in snapshot['histograms'].items():
+            lines.append('%-24s %6d %8.1f %8.1f %8.1f' % (
+                name, h['count'], h['p50'] * 1000, h['p95'] * 1000, h['max'] * 1000
+            ))
+        for kind in ('counters', 'gauges'):
+            for name, value in sorted(snapshot[kind].items()):
+                lines.append('%-24s %6d' % (name, value))
+        return '\n'.join(lines)
+
+
+metrics = Metrics()
+
+class Slider(QtWidgets.QSlider):
+    # seek = pyqtSignal()
+    # value under the mouse and where the mouse is on screen
+    hovered = pyqtSignal(int, QPoint)
+    left = pyqtSignal()
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.setMouseTracking(True)
+        # per second activity of the recording, drawn under the groove
+        self.activity = b''
+        self._heatmap = None
+
+    def set_activity(self, scores):
+        self.activity = scores or b''
+        self._heatmap = None
+        self.update()
+
+    def heatmap(self):
+        """Return ``(x, score)`` of the pixel columns with activity, the
+        loudest second wins where several share a column."""
+        width = self.width()
+        if self._heatmap is None or self._heatmap[0] != width:
+            count = len(self.activity)
+            columns = []
+            for x in range(width):
+                lo = x * count // width
+                hi = max((x + 1) * count // width, lo + 1)
+                score = max(self.activity[lo:hi], default=0)
+                if score:
+                    columns.append((x, score))
+            self._heatmap = (width, columns)
+        return self._heatmap[1]
+
+    def paintEvent(self, e):  # pylint: disable=invalid-name
+        if self.activity:
+            painter = QPainter(self)
+            top = self.height() // 2 - 3
+            for x, score in self.heatmap():
+                painter.fillRect(x, top, 1, 6, QColor(220, 40, 40, score))
+            painter.end()
+        super().paintEvent(e)
+
+    def value_at(self, x):
+        value = (self.maximum() - self.minimum()) * x / max(self.width(), 1) + self.minimum()
+        return int(min(max(value, self.minimum()), self.maximum()))
+
+    def mouseMoveEvent(self, e):  # pylint: disable=invalid-name
+        self.hovered.emit(self.value_at(e.position().x()), e.globalPosition().toPoint())
+        super().mouseMoveEvent(e)
+
+    def leaveEvent(self, e):  # pylint: disable=invalid-name
+        self.left.emit()
+        super().leaveEvent(e)
+
+    def mousePressEvent(self, e):
+        if e.button() == Qt.MouseButtons.LeftButton:
+            e.accept()
+            x = e.position().x()
+            value = (self.maximum() - self.minimum()) * x / self.width() + self.minimum()
+            self.setValue(int(value))
+            self.sliderMoved.emit(int(value))
+            #self.seek.emit()
+        else:
+            return super().mousePressEvent(self, e)
+
+
+class TimelineBar(QWidget):
+    """A camera's recordings laid out on one wall clock axis.
+
+    Recorded stretches are drawn as blocks with the gaps between them left
+    empty; clicking anywhere asks for playback from that moment. Only the
+    recordings inside the visible window are looked up and painted, the
+    wheel zooms around the mouse.
+    """
+    # wall clock time that was clicked
+    seek_requested = pyqtSignal(float)
+
+    # shortest window the wheel zooms into, seconds
+    min_window = 60
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = None
+        self.window = (0.0, 1.0)
+        self.cursor = None
+        self.setMouseTracking(True)
+        self.setMinimumHeight(24)
+
+    def set_index(self, index, window=None):
+        """Show ``index``, over ``window`` or the last day of footage."""
+        self.index = index
+        if window is None and len(index):
+            end = max(index.end(len(index) - 1), index.starts[-1] + index.typical_duration())
+            window = (max(index.starts[0], end - 24 * 3600), end)
+        self.window = window or (0.0, 1.0)
+        self.update()
+
+    def set_cursor(self, t):
+        self.cursor = t
+        if t is not None and not self.window[0] <= t <= self.window[1]:
+            # keep the playhead in view
+            length = self.window[1] - self.window[0]
+            self.window = (t - length / 2, t + length / 2)
+        self.update()
+
+    def time_at(self, x):
+        start, end = self.window
+        return start + (end - start) * x / max(self.width(), 1)
+
+    def x_at(self, t):
+        start, end = self.window
+        return int((t - start) / max(end - start, 1e-9) * self.width())
+
+    def paintEvent(self, e):  # pylint: disable=invalid-name
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor('#D0D0D0'))
+        if self.index is not None:
+            lo, hi = self.index.span(*self.window)
+            previous = None
+            for position in range(lo, hi):
+                left = max(self.x_at(self.index.starts[position]), 0)
+                end = self.index.end(position)
+                if end <= self.index.starts[position]:
+                    end = self.index.starts[position] + self.index.typical_duration()
+                right = min(self.x_at(end), self.width())
+                if left == previous:
+                    # many short recordings on one pixel, drawn already
+                    continue
+                previous = left
+                painter.fillRect(left, 4, max(right - left, 1), self.height() - 8, QColor('#0078D4'))
+        if self.cursor is not None:
+            painter.setPen(QPen(QColor('black'), 2))
+            x = self.x_at(self.cursor)
+            painter.drawLine(x, 0, x, self.height())
+        painter.end()
+
+    def mouseMoveEvent(self, e):  # pylint: disable=invalid-name
+        t = self.time_at(e.position().x())
+        self.setToolTip(QDateTime.fromSecsSinceEpoch(int(t)).toString('yyyy-MM-dd hh:mm:ss'))
+        super().mouseMoveEvent(e)
+
+    def mousePressEvent(self, e):  # pylint: disable=invalid-name
+        if e.button() == Qt.MouseButton.LeftButton:
+            self.seek_requested.emit(self.time_at(e.position().x()))
+        else:
+            super().mousePressEvent(e)
+
+    def wheelEvent(self, e):  # pylint: disable=invalid-name
+        start, end = self.window
+        pivot = self.time_at(e.position().x())
+        factor = 0.8 if e.angleDelta().y() > 0 else 1.25
+        length = max((end - start) * factor, self.min_window)
+        ratio = (pivot - start) / max(end - start, 1e-9)
+        self.window = (pivot - length * ratio, pivot + length * (1 - ratio))
+        self.update()
+
+
+class ThumbFrame(QLabel):
+    clicked = pyqtSignal()
+
+    def mouseDoubleClickEvent(self, a0):
+        self.clicked.emit()
+
+
+class ThumbnailCache:
+    """Persistent, content-addressed store for generated thumbnails.
+
+    Entries are keyed by the source recording's path, size and mtime plus the
+    requested thumbnail size, so a recording that changes on disk simply gets
+    a new entry while the stale one ages out. Once the store grows past
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+    extension = '.jpg'
+
+    def __init__(self, directory, max_bytes=THUMBNAIL_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # file name -> size in bytes, least recently used first
+        self._entries = OrderedDict()
+        self._total = 0
+        os.makedirs(directory, exist_ok=True)
+        # what could not be rendered, under the same keys
+        self.failures = FailureCache(os.path.join(directory, FailureCache.file_name))
+        self._load()
+
+    def _load(self):
+        found = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.name == FailureCache.file_name:
+                continue
+            if entry.name.endswith('.tmp'):
+                # left behind by an interrupted run
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._total += size
+        self._evict()
+
+    @staticmethod
+    def key(video_file, size=THUMBNAIL_SIZE, variant=''):
+        """Return the cache key of ``video_file`` rendered at ``size``.
+
+        ``video_file`` may be a path or an ``os.DirEntry``, whose cached stat
+        result is reused. ``variant`` tells apart renderings of the same size
+        made in different ways. Raises ``OSError`` if the file cannot be
+        stat'ed.
+        """
+        path = os.fspath(video_file)
+        if isinstance(video_file, os.DirEntry):
+            stat = video_file.stat()
+        else:
+            stat = os.stat(path)
+        ident = '{}|{}|{}|{}x{}|{}'.format(
+            os.path.normcase(os.path.abspath(path)), stat.st_size,
+            stat.st_mtime_ns, size[0], size[1], variant
+        )
+        return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+    def lookup(self, key, extension=None):
+        """Return the path of the cached thumbnail for ``key`` or ``None``."""
+        name = key + (extension or self.extension)
+        with self._lock:
+            if name not in self._entries:
+                metrics.count('cache.miss')
+                return None
+            self._entries.move_to_end(name)
+        metrics.count('cache.hit')
+        path = os.path.join(self.directory, name)
+        try:
+            # the mtime doubles as the recency stamp across restarts
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                size = self._entries.pop(name, None)
+                if size is not None:
+                    self._total -= size
+            return None
+        return path
+
+    def temp_path(self, key, extension=None):
+        """Return a unique scratch path to render the thumbnail for ``key`` to."""
+        return os.path.join(
+            self.directory, f'{key}.{randint(1, 100000000)}{extension or self.extension}.tmp'
+        )
+
+    def store(self, key, temp_file, extension=None):
+        """Move a rendered ``temp_file`` into the cache and return its final path."""
+        name = key + (extension or self.extension)
+        path = os.path.join(self.directory, name)
+        size = os.path.getsize(temp_file)
+        os.replace(temp_file, path)
+        self.failures.clear(key)
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._total -= old
+            self._entries[name] = size
+            self._total += size
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+class FailureCache:
+    """Negative cache of recordings that could not be decoded.
+
+    Keys are ``ThumbnailCache`` keys, so they cover the recording's path,
+    size and mtime: a file that is still being written gets a new key once
+    it grows and is tried again right away, while a broken one is skipped
+    until its retry time, which backs off with every failure.
+    """
+    file_name = 'failures.json'
+
+    def __init__(self, path, retry_after=FAILURE_RETRY_SECONDS,
+                 max_retry_after=FAILURE_RETRY_MAX_SECONDS):
+        self.path = path
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        self._lock = threading.Lock()
+        # key -> [failures, retry at (epoch seconds), reason]
+        try:
+            with open(path, encoding='utf-8') as f:
+                self._entries = dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            self._entries = {}
+
+    def blocked(self, key):
+        """Return whether ``key`` failed recently and should not be retried."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.time():
+            metrics.count('decode.skipped')
+            return True
+        return False
+
+    def record(self, key, reason):
+        now = time.time()
+        with self._lock:
+            failures = self._entries.get(key, [0])[0] + 1
+            delay = min(self.retry_after * 2 ** (failures - 1), self.max_retry_after)
+            self._entries[key] = [failures, now + delay, reason]
+            # entries whose retry time passed long ago belong to files that
+            # were fixed or deleted in the meantime
+            self._entries = {
+                name: entry for name, entry in self._entries.items()
+                if entry[1] > now - self.max_retry_after
+            }
+            self._save()
+        metrics.count('decode.failed')
+
+    def clear(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def _save(self):
+        temp = f'{self.path}.{randint(1, 100000000)}.tmp'
+        try:
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(temp, self.path)
+        except OSError:
+            # losing the negative cache only costs a retry
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+
+
+class Cancelled(Exception):
+    """Raised inside a job whose ``CancelToken`` was cancelled."""
+
+
+class DecodeError(Exception):
+    """Raised when ffmpeg or ffprobe exits with an error, carrying its
+    output like ``ffmpeg.Error`` does."""
+    def __init__(self, cmd, stdout, stderr):
+        super().__init__(f'{cmd} error (see stderr output for detail)')
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+class DecodeTimeout(Exception):
+    """Raised when ffmpeg or ffprobe ran past its deadline and was killed."""
+
+
+class ToolMissing(OSError):
+    """Raised when ffmpeg or ffprobe cannot be started at all, which says
+    nothing about the recording it was meant to decode."""
+
+
+def failure_reason(error):
+    """Short description of why decoding failed, ffmpeg's last words if any."""
+    stderr = getattr(error, 'stderr', None)
+    if stderr:
+        lines = stderr.decode('utf-8', 'replace').strip().splitlines()
+        if lines:
+            return lines[-1][:200]
+    return str(error)[:200] or type(error).__name__
+
+
+# what the decoding helpers raise for a recording that cannot be decoded,
+# as opposed to Cancelled or a bug
+DECODE_ERRORS = (DecodeError, DecodeTimeout, OSError, ValueError, KeyError, IndexError)
+# the ones that blame the recording itself and go into the FailureCache; an
+# OSError is the host's (no ffmpeg, cache disk full) and is only reported
+RECORDING_ERRORS = (DecodeError, DecodeTimeout, ValueError, KeyError, IndexError)
+
+_reported_errors = set()
+_reported_errors_lock = threading.Lock()
+
+
+def report_environment_error(error):
+    """Print an error of the host rather than of a recording, once."""
+    metrics.count('decode.environment')
+    message = failure_reason(error)
+    with _reported_errors_lock:
+        if message in _reported_errors:
+            return
+        _reported_errors.add(message)
+    print(message, file=sys.stderr)
+
+
+def record_failure(failures, key, error):
+    """Remember ``key`` in ``failures`` if ``error`` is the recording's fault."""
+    if isinstance(error, RECORDING_ERRORS):
+        failures.record(key, failure_reason(error))
+    else:
+        report_environment_error(error)
+
+
+def _discard(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class CancelToken:
+    """Cooperative cancellation flag shared by all jobs of one folder visit.
+
+    ``generation`` identifies the visit, so results that arrive after a newer
+    visit started can be recognised and dropped. Cancelling kills every
+    child process registered with the token and cancels its queued futures.
+    """
+    def __init__(self, generation=0):
+        self.generation = generation
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes = set()
+        self._futures = []
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            processes = list(self._processes)
+            futures, self._futures = self._futures, []
+        for future in futures:
+            future.cancel()
+        for process in processes:
+            _kill(process)
+
+    def add_future(self, future):
+        with self._lock:
+            if not self._event.is_set():
+                self._futures = [f for f in self._futures if not f.done()]
+                self._futures.append(future)
+                return
+        future.cancel()
+
+    def register(self, process):
+        with self._lock:
+            if not self._event.is_set():
+                self._processes.add(process)
+                return
+        _kill(process)
+
+    def unregister(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+
+def _kill(process):
+    try:
+        process.kill()
+    except OSError:
+        pass
+
+
+def run_process(args, token=None, timeout=None):
+    """Run ``args`` to completion and return ``(returncode, stdout, stderr)``.
+
+    The child is killed as soon as ``token`` is cancelled, in which case
+    ``Cancelled`` is raised instead, or once it runs longer than ``timeout``
+    seconds, which raises ``DecodeTimeout``.
+    """
+    if token is not None:
+        token.check()
+    try:
+        process = subprocess.Popen(
+            args, stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except (FileNotFoundError, PermissionError) as e:
+        raise ToolMissing(e.errno, f'cannot run {args[0]}: {e.strerror}') from e
+    if token is not None:
+        token.register(process)
+    try:
+        out, err = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill(process)
+        try:
+            process.communicate(timeout=5)
+        except subprocess.TimeoutExpired:
+            # a grandchild still holds the pipes, don't wait on it
+            pass
+        metrics.count('process.timeout')
+        raise DecodeTimeout(f'{os.path.basename(args[0])} ran longer than {timeout}s')
+    finally:
+        if token is not None:
+            token.unregister(process)
+    if token is not None:
+        token.check()
+    return process.returncode, out, err
+
+
+@metrics.timed('ffprobe')
+def probe_video(path, token=None, timeout=FFPROBE_TIMEOUT):
+    """Return ffprobe's description of ``path``, like ``ffmpeg.probe``."""
+    args = ['ffprobe', '-show_format', '-show_streams', '-of', 'json', path]
+    code, out, err = run_process(args, token, timeout)
+    if code != 0:
+        raise DecodeError('ffprobe', out, err)
+    return json.loads(out.decode('utf-8'))
+
+
+@metrics.timed('ffmpeg')
+def run_ffmpeg(stream, token=None, timeout=FFMPEG_TIMEOUT):
+    """Run an ffmpeg-python ``stream`` the way ``stream.run()`` would,
+    but stoppable through ``token`` and killed after ``timeout`` seconds."""
+    code, out, err = run_process(stream.compile(), token, timeout)
+    if code != 0:
+        raise DecodeError('ffmpeg', out, err)
+    return out, err
+
+
+def _extract_keyframe(in_filename, out_filename, offset, size, token=None):
+    """Write the first keyframe at or after ``offset`` scaled to ``size``.
+
+    Seeking happens on the input side without decoding up to ``offset`` and
+    only keyframes are decoded at all, so the cost barely depends on the
+    clip's resolution or length. Returns ``False`` if no frame came out,
+    e.g. because ``offset`` lies past the end of the clip.
+    """
+    run_ffmpeg(
+        ffmpeg
+        .input(in_filename, ss=offset, skip_frame='nokey', noaccurate_seek=None)
+        .filter('scale', size[0], size[1])
+        .output(out_filename, vframes=1, format='image2', vcodec='mjpeg',
+                pix_fmt='yuvj420p', **{'q:v': 5})
+        .overwrite_output(),
+        token
+    )
+    return os.path.exists(out_filename) and os.path.getsize(out_filename) > 0
+
+
+@metrics.timed('thumbnail')
+def generate_thumbnail(in_filename, cache, size=THUMBNAIL_SIZE, token=None,
+                       duration=None, fast=FAST_THUMBNAILS):
+    """Return the path of a cached thumbnail of ``in_filename``, rendering it
+    first if needed, or ``None`` if the recording could not be decoded.
+
+    In ``fast`` mode the midpoint is used only when ``duration`` is already
+    known; otherwise the frame is taken ``FAST_THUMBNAIL_OFFSET`` seconds in,
+    which saves running ffprobe.
+    """
+    try:
+        key = cache.key(in_filename, size, 'fast' if fast else 'full')
+    except OSError:
+        return None
+    cached = cache.lookup(key)
+    if cached:
+        return cached
+    if cache.failures.blocked(key):
+        return None
+    out_filename = cache.temp_path(key)
+    path = os.fspath(in_filename)
+    try:
+        if fast:
+            offset = duration / 2 if duration else FAST_THUMBNAIL_OFFSET
+            try:
+                extracted = _extract_keyframe(path, out_filename, offset, size, token)
+            except DecodeError:
+                extracted = False
+            if not extracted:
+                # clip shorter than the offset, fall back to its first frame
+                if not _extract_keyframe(path, out_filename, 0, size, token):
+                    raise ValueError(f'no frame decoded from {path}')
+            return cache.store(key, out_filename)
+        probe = probe_video(path, token)
+        time = float(probe['streams'][0]['duration']) // 2
+        width = probe['streams'][0]['width']
+        run_ffmpeg(
+            ffmpeg
+            .input(path, ss=time)
+            .filter('scale', width, -1)
+            .output(out_filename, vframes=1, format='image2', vcodec='mjpeg',
+                    pix_fmt='yuvj420p')
+            .overwrite_output(),
+            token
+        )
+        return cache.store(key, out_filename)
+    except Cancelled:
+        _discard(out_filename)
+        raise
+    except DECODE_ERRORS as e:
+        _discard(out_filename)
+        record_failure(cache.failures, key, e)
+        return None
+
+
+@metrics.timed('storyboard')
+def generate_storyboard(in_filename, cache, token=None, duration=None):
+    """Return ``(sprite, index)`` for ``in_filename``, rendering them first
+    if they are not cached, or ``None`` if the recording could not be decoded.
+
+    ``sprite`` is the path of one image holding ``index['count']`` frames
+    taken every ``index['interval']`` seconds, laid out row by row in tiles
+    of ``index['tile_width']`` by ``index['tile_height']``. All frames come
+    out of a single ffmpeg pass that decodes keyframes only.
+    """
+    columns, rows = STORYBOARD_TILES
+    tile_width, tile_height = STORYBOARD_TILE_SIZE
+    path = os.fspath(in_filename)
+    try:
+        key = cache.key(in_filename, (columns * tile_width, rows * tile_height), 'storyboard')
+    except OSError:
+        return None
+    sprite = cache.lookup(key)
+    index_file = cache.lookup(key, '.json')
+    if sprite and index_file:
+        try:
+            with open(index_file, encoding='utf-8') as handle:
+                return sprite, json.load(handle)
+        except (OSError, ValueError):
+            pass
+    if cache.failures.blocked(key):
+        return None
+    out_filename = cache.temp_path(key)
+    index_temp = cache.temp_path(key, '.json')
+    try:
+        if not duration:
+            duration = probe_metadata(path, token)[0]
+        if not duration:
+            return None
+        count = columns * rows
+        run_ffmpeg(
+            ffmpeg
+            .input(path, skip_frame='nokey')
+            .filter('fps', fps=count / duration)
+            .filter('scale', tile_width, tile_height)
+            .filter('tile', f'{columns}x{rows}')
+            .output(out_filename, vframes=1, format='image2', vcodec='mjpeg',
+                    pix_fmt='yuvj420p', **{'q:v': 5})
+            .overwrite_output(),
+            token, FFMPEG_PASS_TIMEOUT
+        )
+        index = {
+            'columns': columns, 'rows': rows, 'count': count,
+            'tile_width': tile_width, 'tile_height': tile_height,
+            'interval': duration / count, 'duration': duration,
+        }
+        with open(index_temp, 'w', encoding='utf-8') as handle:
+            json.dump(index, handle)
+        sprite = cache.store(key, out_filename)
+        cache.store(key, index_temp, '.json')
+        return sprite, index
+    except Cancelled:
+        _discard(out_filename, index_temp)
+        raise
+    except DECODE_ERRORS as e:
+        _discard(out_filename, index_temp)
+        record_failure(cache.failures, key, e)
+        return None
+
+
+def storyboard_frame(sprite, index, fraction):
+    """Cut the frame at ``fraction`` (0 to 1) of the clip out of a sprite."""
+    tile = min(int(fraction * index['count']), index['count'] - 1)
+    column, row = tile % index['columns'], tile // index['columns']
+    return sprite.copy(QRect(
+        column * index['tile_width'], row * index['tile_height'],
+        index['tile_width'], index['tile_height']
+    ))
+
+
+def activity_scores(frames, fps=MOTION_FPS):
+    """Score every second of ``frames``, an ``(n, height, width)`` array of
+    grey frames, by the largest share of pixels that changed between two of
+    its consecutive frames; returns one byte (0-255) per second."""
+    if len(frames) < 2:
+        return b''
+    changed = np.abs(np.diff(frames.astype(np.int16), axis=0)) > MOTION_PIXEL_THRESHOLD
+    shares = changed.reshape(len(changed), -1).mean(axis=1)
+    seconds = -(-len(shares) // fps)
+    padded = np.zeros(seconds * fps)
+    padded[:len(shares)] = shares
+    per_second = padded.reshape(seconds, fps).max(axis=1)
+    # a quarter of the picture changing already saturates the scale
+    return np.minimum(per_second * 4 * 255, 255).astype(np.uint8).tobytes()
+
+
+@metrics.timed('activity')
+def generate_activity(in_filename, cache, token=None):
+    """Return the per second activity scores of ``in_filename``, analysing
+    and caching them first if needed, or ``None`` without numpy or when the
+    recording could not be decoded."""
+    if not HAVE_NUMPY:
+        return None
+    try:
+        key = cache.key(in_filename, MOTION_SIZE, 'motion')
+    except OSError:
+        return None
+    cached = cache.lookup(key, '.motion')
+    if cached:
+        try:
+            with open(cached, 'rb') as f:
+                return f.read()
+        except OSError:
+            pass
+    if cache.failures.blocked(key):
+        return None
+    width, height = MOTION_SIZE
+    try:
+        out, _ = run_ffmpeg(
+            ffmpeg
+            .input(os.fspath(in_filename), skip_frame='noref')
+            .filter('fps', MOTION_FPS)
+            .filter('scale', width, height)
+            .output('pipe:', format='rawvideo', pix_fmt='gray'),
+            token, FFMPEG_PASS_TIMEOUT
+        )
+    except DECODE_ERRORS as e:
+        record_failure(cache.failures, key, e)
+        return None
+    frames = np.frombuffer(out, np.uint8)
+    frames = frames[:len(frames) - len(frames) % (width * height)].reshape(-1, height, width)
+    scores = activity_scores(frames)
+    temp = cache.temp_path(key, '.motion')
+    try:
+        with open(temp, 'wb') as f:
+            f.write(scores)
+        cache.store(key, temp, '.motion')
+    except OSError as e:
+        # the scores are still good for this session
+        _discard(temp)
+        report_environment_error(e)
+    return scores
+
+
+def next_event(scores, after):
+    """Return the first second after ``after`` at which activity starts."""
+    for second in range(max(int(after) + 1, 1), len(scores)):
+        if scores[second] >= MOTION_EVENT_THRESHOLD > scores[second - 1]:
+            return second
+    return None
+
+
+def export_segments(index, start, end):
+    """Return the recordings of a camera's time ``index`` covering
+    ``start <= t < end`` as ``(path, inpoint, outpoint)``, the points in
+    seconds into the file or ``None`` where the whole file is used."""
+    lo, hi = index.span(start, end)
+    segments = []
+    for position in range(lo, hi):
+        begin = index.starts[position]
+        finish = index.end(position)
+        inpoint = start - begin if start > begin else None
+        outpoint = end - begin if finish > begin and end < finish else None
+        segments.append((index.paths[position], inpoint, outpoint))
+    return segments
+
+
+def concat_list(segments):
+    """Write ``segments`` in ffmpeg's concat demuxer format."""
+    lines = ['ffconcat version 1.0']
+    for path, inpoint, outpoint in segments:
+        escaped = os.path.abspath(path).replace('\\', '/').replace("'", "'\\''")
+        lines.append(f"file '{escaped}'")
+        if inpoint:
+            lines.append(f'inpoint {inpoint:.3f}')
+        if outpoint is not None:
+            lines.append(f'outpoint {outpoint:.3f}')
+    return '\n'.join(lines) + '\n'
+
+
+@metrics.timed('export')
+def export_clip(segments, out_filename, duration, token=None, progress=None,
+                timeout=FFMPEG_PASS_TIMEOUT):
+    """Join ``segments`` (see ``export_segments``) into ``out_filename``.
+
+    Packets are copied, not re-encoded, so cuts land on the keyframe before
+    each in-point and an hour of footage costs about as much as copying
+    it. ``progress`` is called with the fraction of ``duration`` written.
+    """
+    directory = os.path.dirname(os.path.abspath(out_filename))
+    list_file = os.path.join(directory, f'.export.{randint(1, 100000000)}.ffconcat')
+    part_file = f'{out_filename}.part'
+    with open(list_file, 'w', encoding='utf-8') as f:
+        f.write(concat_list(segments))
+    extension = os.path.splitext(out_filename)[1].lstrip('.') or 'mp4'
+    args = (
+        ffmpeg
+        .input(list_file, f='concat', safe=0)
+        .output(part_file, c='copy', map=0, f=EXPORT_FORMATS.get(extension, extension),
+                avoid_negative_ts='make_zero')
+        .global_args('-progress', 'pipe:1', '-nostats', '-loglevel', 'error')
+        .overwrite_output()
+        .compile()
+    )
+    stderr = tempfile.TemporaryFile()
+    try:
+        process = subprocess.Popen(
+            args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=stderr
+        )
+    except (FileNotFoundError, PermissionError) as e:
+        stderr.close()
+        _discard(list_file)
+        raise ToolMissing(e.errno, f'cannot run {args[0]}: {e.strerror}') from e
+    if token is not None:
+        token.register(process)
+    # ffmpeg stuck on a dead share prints nothing, so the deadline cannot
+    # be checked between progress lines; a timer kills it instead
+    expired = threading.Event()
+
+    def expire():
+        expired.set()
+        _kill(process)
+    watchdog = threading.Timer(timeout, expire)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        for line in process.stdout:
+            key, _, value = line.decode('ascii', 'replace').strip().partition('=')
+            if key == 'out_time_us' and value.isdigit() and progress and duration:
+                progress(min(int(value) / 1000000 / duration, 1.0))
+        process.wait()
+        if token is not None:
+            token.check()
+        if expired.is_set():
+            metrics.count('process.timeout')
+            raise DecodeTimeout(f'export ran longer than {timeout}s')
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise DecodeError('ffmpeg', b'', stderr.read())
+        os.replace(part_file, out_filename)
+    except BaseException:
+        _kill(process)
+        process.wait()
+        _discard(part_file)
+        raise
+    finally:
+        watchdog.cancel()
+        if token is not None:
+            token.unregister(process)
+        stderr.close()
+        _discard(list_file)
+    return out_filename
+
+
+@metrics.timed('pixmap.decode')
+def thumbnail_pixmap(path):
+    """Load a thumbnail for display, scaling only if it was not rendered at
+    ``THUMBNAIL_SIZE`` already."""
+    im = QPixmap(path)
+    if im.width() == THUMBNAIL_SIZE[0] and im.height() == THUMBNAIL_SIZE[1]:
+        return im
+    return im.scaled(*THUMBNAIL_SIZE, Qt.AspectRatioMode.IgnoreAspectRatio)
+
+
+scan_executor = ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix='scan')
+_mount_limits = {}
+_mount_limits_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def mount_of(path):
+    """Return the mount point (or drive, or UNC share) ``path`` is on."""
+    path = os.path.abspath(path)
+    drive = os.path.splitdrive(path)[0]
+    if drive:
+        return os.path.normcase(drive)
+    parent = os.path.dirname(path)
+    if parent == path or os.path.ismount(path):
+        return path
+    return mount_of(parent)
+
+
+def mount_limit(path):
+    """Return the semaphore that bounds the requests in flight to the mount
+    of ``path``. Mount points are looked up once per folder and cached, so
+    callers going through many folders of one mount pass its limit along."""
+    mount = mount_of(path)
+    with _mount_limits_lock:
+        limit = _mount_limits.get(mount)
+        if limit is None:
+            limit = _mount_limits[mount] = threading.BoundedSemaphore(SCAN_CONCURRENCY_PER_MOUNT)
+    return limit
+
+
+def scan_directory(path, limit=None):
+    """Return the ``os.DirEntry`` list of ``path``, read within its mount's
+    limit. The entries know their type from the listing itself, and on
+    Windows their whole stat, so looking at them costs no more requests."""
+    with limit or mount_limit(path), os.scandir(path) as entries:
+        return list(entries)
+
+
+def stat_files(entries, limit):
+    """Return ``(entry, stat)`` for the files among ``entries``, leaving out
+    those that vanished. The stats the listing did not already provide are
+    fetched in parallel, no more than ``limit`` allows at a time."""
+    files = []
+    for entry in entries:
+        try:
+            if entry.is_file():
+                files.append(entry)
+        except OSError:
+            continue
+
+    def stat(entry):
+        try:
+            with limit:
+                return entry, entry.stat()
+        except OSError:
+            return entry, None
+    if os.name == 'nt' or len(files) < 2:
+        results = map(stat, files)
+    else:
+        results = scan_executor.map(stat, files)
+    return [(entry, result) for entry, result in results if result is not None]
+
+
+def walk_directories(root, token=None):
+    """Yield ``(directory, entries)`` for ``root`` and every folder below
+    it, breadth first, listing the folders of each level in parallel."""
+    limit = mount_limit(root)
+
+    def listing(directory):
+        try:
+            return scan_directory(directory, limit)
+        except OSError:
+            return []
+    level = [root]
+    while level:
+        if token is not None:
+            token.check()
+        below = []
+        for directory, entries in zip(level, scan_executor.map(listing, level)):
+            if token is not None:
+                token.check()
+            yield directory, entries
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        below.append(entry.path)
+                except OSError:
+                    continue
+        level = below
+
+
+def newest_recording(directory):
+    """Return the most recently created file in ``directory`` or ``None``."""
+    limit = mount_limit(directory)
+    try:
+        videos = stat_files(scan_directory(directory, limit), limit)
+    except OSError:
+        return None
+    newest = max(videos, key=lambda video: video[1].st_ctime, default=None)
+    return newest[0] if newest else None
+
+def generate_media_list(directory: str, cur_media=None, include=False, catalog=None):
+    if catalog is not None:
+        # as the catalog has them, callers bring it up to date off the GUI thread
+        yield from catalog.following(directory, cur_media, include)
+        return
+    limit = mount_limit(directory)
+    media_list = [
+        entry.path for entry, _ in sorted(
+            stat_files(scan_directory(directory, limit), limit),
+            key=lambda video: video[1].st_ctime, reverse=True
+        )
+    ]
+    if cur_media:
+        try:
+            media_index = media_list.index(cur_media)
+            if include:
+                media_list = media_list[media_index:]
+            else:
+                media_list = media_list[media_index+1:]
+        except ValueError:
+            pass
+    for file in media_list:
+        yield file
+
+
+def probe_metadata(path, token=None):
+    """Return ``(duration, width, height, codec)`` of the first video stream
+    of ``path``; fields ffprobe does not report are ``None``."""
+    probe = probe_video(path, token)
+    stream = next(
+        (st for st in probe.get('streams', []) if st.get('codec_type') == 'video'), {}
+    )
+    duration = stream.get('duration') or probe.get('format', {}).get('duration')
+    return (
+        float(duration) if duration else None,
+        stream.get('width'), stream.get('height'), stream.get('codec_name')
+    )
+
+
+class TimeIndex:
+    """Recordings of one camera sorted by start time.
+
+    Range lookups are two binary searches, so finding an hour in months of
+    footage costs the same as in a day's worth.
+    """
+    def __init__(self, rows):
+        # rows are (ctime, path, duration) sorted by ctime
+        self.starts = [row[0] for row in rows]
+        self.paths = [row[1] for row in rows]
+        self.durations = [row[2] for row in rows]
+        self._typical = None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def end(self, position):
+        """Return when recording ``position`` ends, assuming it runs up to
+        the next one when its duration is unknown, or for a typical duration
+        when it is the newest, probably still being written."""
+        if self.durations[position]:
+            return self.starts[position] + self.durations[position]
+        if position + 1 < len(self.starts):
+            return self.starts[position + 1]
+        return self.starts[position] + self.typical_duration()
+
+    def span(self, start, end):
+        """Return the positions ``lo, hi`` of the recordings overlapping
+        ``start <= t < end``, including one that began before ``start``
+        and is still running then."""
+        lo = bisect_left(self.starts, start)
+        hi = bisect_left(self.starts, end)
+        if lo > 0 and self.end(lo - 1) > start:
+            lo -= 1
+        return lo, hi
+
+    def between(self, start, end):
+        lo, hi = self.span(start, end)
+        return self.paths[lo:hi]
+
+    def typical_duration(self):
+        """Median length of the recordings whose duration is known."""
+        if self._typical is None:
+            known = sorted(duration for duration in self.durations if duration)
+            self._typical = known[len(known) // 2] if known else SEGMENT_SECONDS
+        return self._typical
+
+    def locate(self, t):
+        """Return the position of the recording running at ``t``, or None
+        when ``t`` falls into a gap in the footage."""
+        position = bisect_right(self.starts, t) - 1
+        if position < 0:
+            return None
+        return position if t < self.end(position) else None
+
+
+class RecordingCatalog:
+    """Persistent SQLite index of camera folders and their recordings.
+
+    A camera is only rescanned when its directory mtime changed since the
+    last visit, and then only the difference is written back, so listing a
+    camera with thousands of segments usually costs one ``stat``. Newest
+    first listings and time range queries are served from an index on
+    ``(camera, ctime)``. Every thread gets its own connection.
+    """
+    schema = """
+    CREATE TABLE IF NOT EXISTS cameras (
+        path TEXT PRIMARY KEY,
+        mtime_ns INTEGER NOT NULL,
+        scanned_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS recordings (
+        path TEXT PRIMARY KEY,
+        camera TEXT NOT NULL,
+        ctime REAL NOT NULL,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        duration REAL,
+        width INTEGER,
+        height INTEGER,
+        codec TEXT
+    );
+    CREATE INDEX IF NOT EXISTS recordings_by_time ON recordings (camera, ctime, path);
+    """
+
+    def __init__(self, path=CATALOG_PATH):
+        self.path = path
+        self._local = threading.local()
+        # camera -> (version, TimeIndex), rebuilt when its recordings change
+        self._versions = {}
+        self._indexes = {}
+        self._index_lock = threading.Lock()
+        # sqlite allows one writer at a time, serialise them here instead
+        # of waiting on its busy timeout
+        self._write_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db().executescript(self.schema)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            self._local.db = db
+        return db
+
+    @metrics.timed('catalog.refresh')
+    def refresh(self, camera):
+        """Bring ``camera`` up to date with the disk.
+
+        Returns the ``(added, removed)`` recording paths, both empty when
+        the directory did not change.
+        """
+        camera = os.path.normpath(camera)
+        db = self._db()
+        limit = mount_limit(camera)
+        try:
+            with limit:
+                mtime_ns = os.stat(camera).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        row = db.execute('SELECT mtime_ns FROM cameras WHERE path = ?', (camera,)).fetchone()
+        if row is not None and row[0] == mtime_ns:
+            return [], []
+        found = {}
+        if mtime_ns is not None:
+            try:
+                entries = scan_directory(camera, limit)
+            except OSError:
+                entries = []
+            for entry, stat in stat_files(entries, limit):
+                found[entry.path] = (stat.st_ctime, stat.st_size, stat.st_mtime_ns)
+        known = {
+            path: (ctime, size, mtime)
+            for path, ctime, size, mtime in db.execute(
+                'SELECT path, ctime, size, mtime_ns FROM recordings WHERE camera = ?', (camera,)
+            )
+        }
+        added = [path for path in found if path not in known]
+        removed = [path for path in known if path not in found]
+        changed = [
+            path for path in found
+            if path in known and known[path][1:] != found[path][1:]
+        ]
+        with self._write_lock, db:
+            db.executemany('DELETE FROM recordings WHERE path = ?', [(path,) for path in removed])
+            # a rewritten segment loses its metadata and is probed again
+            db.executemany(
+                'INSERT OR REPLACE INTO recordings (path, camera, ctime, size, mtime_ns) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [(path, camera) + found[path] for path in added + changed]
+            )
+            if mtime_ns is None:
+                db.execute('DELETE FROM cameras WHERE path = ?', (camera,))
+            else:
+                db.execute(
+                    'INSERT OR REPLACE INTO cameras (path, mtime_ns, scanned_at) VALUES (?, ?, ?)',
+                    (camera, mtime_ns, time.time())
+                )
+        if added or removed or changed:
+            self._changed(camera)
+        return added, removed
+
+    def _changed(self, camera):
+        with self._index_lock:
+            self._versions[camera] = self._versions.get(camera, 0) + 1
+
+    def time_index(self, camera):
+        """Return the ``TimeIndex`` of ``camera``, built once per change."""
+        camera = os.path.normpath(camera)
+        with self._index_lock:
+            version = self._versions.get(camera, 0)
+            cached = self._indexes.get(camera)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = TimeIndex(self._db().execute(
+            'SELECT ctime, path, duration FROM recordings WHERE camera = ? '
+            'ORDER BY ctime ASC, path ASC',
+            (camera,)
+        ).fetchall())
+        with self._index_lock:
+            self._indexes[camera] = (version, index)
+        return index
+
+    def recordings(self, camera, newest_first=True, start=None, end=None):
+        """Return the recordings of ``camera`` with ``start <= ctime < end``."""
+        query = 'SELECT path FROM recordings WHERE camera = ?'
+        args = [os.path.normpath(camera)]
+        if start is not None:
+            query += ' AND ctime >= ?'
+            args.append(start)
+        if end is not None:
+            query += ' AND ctime < ?'
+            args.append(end)
+        order = 'DESC' if newest_first else 'ASC'
+        query += f' ORDER BY ctime {order}, path {order}'
+        return [row[0] for row in self._db().execute(query, args)]
+
+    def newest(self, camera):
+        row = self._db().execute(
+            'SELECT path FROM recordings WHERE camera = ? ORDER BY ctime DESC, path DESC LIMIT 1',
+            (os.path.normpath(camera),)
+        ).fetchone()
+        return row[0] if row else None
+
+    def following(self, camera, path=None, include=False):
+        """Return the recordings listed after ``path`` in newest first order,
+        which is how the player moves from one segment to the next."""
+        camera = os.path.normpath(camera)
+        db = self._db()
+        row = None
+        if path:
+            row = db.execute(
+                'SELECT ctime FROM recordings WHERE path = ? AND camera = ?', (path, camera)
+            ).fetchone()
+        if row is None:
+            return self.recordings(camera)
+        operator = '<=' if include else '<'
+        return [found[0] for found in db.execute(
+            'SELECT path FROM recordings WHERE camera = ? AND '
+            f'(ctime < ? OR (ctime = ? AND path {operator} ?)) '
+            'ORDER BY ctime DESC, path DESC',
+            (camera, row[0], row[0], path)
+        )]
+
+    def metadata(self, path):
+        """Return ``(ctime, size, duration, width, height, codec)`` or ``None``."""
+        return self._db().execute(
+            'SELECT ctime, size, duration, width, height, codec FROM recordings WHERE path = ?',
+            (path,)
+        ).fetchone()
+
+    def missing_metadata(self, camera):
+        return [row[0] for row in self._db().execute(
+            'SELECT path FROM recordings WHERE camera = ? AND duration IS NULL '
+            'ORDER BY ctime DESC',
+            (os.path.normpath(camera),)
+        )]
+
+    def set_metadata(self, path, duration, width, height, codec):
+        db = self._db()
+        with self._write_lock, db:
+            db.execute(
+                'UPDATE recordings SET duration = ?, width = ?, height = ?, codec = ? WHERE path = ?',
+                (duration, width, height, codec, path)
+            )
+        self._changed(os.path.dirname(path))
+
+    def touch(self, path):
+        """Re-read the size and times of one recording, e.g. once it has
+        been written completely."""
+        stat = os.stat(path)
+        db = self._db()
+        with self._write_lock, db:
+            db.execute(
+                'UPDATE recordings SET ctime = ?, size = ?, mtime_ns = ?, duration = NULL, '
+                'width = NULL, height = NULL, codec = NULL WHERE path = ?',
+                (stat.st_ctime, stat.st_size, stat.st_mtime_ns, path)
+            )
+        self._changed(os.path.dirname(path))
+
+    def probe(self, path, token=None, failures=None):
+        """Probe one recording into the catalog and return its duration, or
+        ``None`` when it cannot be probed (now or, per ``failures``, lately)."""
+        try:
+            key = ThumbnailCache.key(path, (0, 0), 'probe')
+        except OSError:
+            return None
+        if failures is not None and failures.blocked(key):
+            return None
+        try:
+            metadata = probe_metadata(path, token)
+        except DECODE_ERRORS as e:
+            if failures is not None:
+                record_failure(failures, key, e)
+            return None
+        self.set_metadata(path, *metadata)
+        return metadata[0]
+
+    def fill_metadata(self, camera, token=None, failures=None):
+        """Probe the recordings of ``camera`` that have no metadata yet."""
+        for path in self.missing_metadata(camera):
+            if token is not None and token.cancelled:
+                return
+            try:
+                self.probe(path, token, failures)
+            except Cancelled:
+                return
+
+
+class BranchIndex:
+    """In-memory n-gram index over the folder names below a camera root.
+
+    It is built once per root off the GUI thread and then kept current as
+    folders come and go, so searching never touches the disk. A query
+    intersects the posting sets of the trigrams of each of its words (word
+    prefixes for words shorter than that) and confirms the few candidates
+    left by substring match. Broad queries stop after ``max_candidates``
+    matches, or once ``limit`` folders whose own name starts with the query
+    turned up, and rank only those.
+    """
+    gram = 3
+    max_candidates = 2000
+
+    def __init__(self, root):
+        self.root = os.path.normpath(root)
+        # id -> folder path, label and normalised label, path is None once removed
+        self._paths = []
+        self._labels = []
+        self._texts = []
+        self._ids = {}
+        self._grams = {}
+        self._prefixes = {}
+
+    @classmethod
+    def build(cls, root, token=None):
+        """Index every folder below ``root``."""
+        index = cls(root)
+        for directory, entries in walk_directories(index.root, token):
+            if directory != index.root:
+                index.add(directory)
+        return index
+
+    def __len__(self):
+        return len(self._ids)
+
+    @staticmethod
+    def normalize(text):
+        return ' '.join(text.lower().split())
+
+    def label(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, ' / ')
+
+    def _words(self, text):
+        return [word for word in re.split(r'[^0-9a-z]+', text) if word]
+
+    def add(self, path):
+        path = os.path.normpath(path)
+        if path in self._ids or not path.startswith(self.root + os.sep):
+            return
+        label = self.label(path)
+        text = self.normalize(label)
+        ident = len(self._paths)
+        self._paths.append(path)
+        self._labels.append(label)
+        self._texts.append(text)
+        self._ids[path] = ident
+        for start in range(len(text) - self.gram + 1):
+            self._grams.setdefault(text[start:start + self.gram], set()).add(ident)
+        for word in self._words(text):
+            for length in range(1, min(len(word), self.gram - 1) + 1):
+                self._prefixes.setdefault(word[:length], set()).add(ident)
+
+    def remove(self, path):
+        """Forget ``path`` and every folder below it."""
+        path = os.path.normpath(path)
+        prefix = path + os.sep
+        for other in [p for p in self._ids if p == path or p.startswith(prefix)]:
+            ident = self._ids.pop(other)
+            # postings keep the id, results skip it
+            self._paths[ident] = None
+
+    def _postings(self, word):
+        if len(word) >= self.gram:
+            grams = {word[start:start + self.gram] for start in range(len(word) - self.gram + 1)}
+            return [self._grams.get(gram, set()) for gram in grams]
+        return [self._prefixes.get(part, set()) for part in self._words(word)]
+
+    def search(self, query, limit=200):
+        """Return up to ``limit`` ``(path, label)`` pairs matching every word
+        of ``query``, folders whose own name matches first."""
+        text = self.normalize(query)
+        words = text.split()
+        if not words:
+            return []
+        postings = []
+        for word in words:
+            postings.extend(self._postings(word))
+        if postings:
+            postings.sort(key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                if len(candidates) <= self.max_candidates:
+                    # few enough to confirm one by one
+                    break
+                candidates = candidates & posting
+        else:
+            candidates = range(len(self._paths))
+        # ids are handed out top down, so a set of them iterates shallow
+        # (short) folders first and stopping early keeps the best ones
+        hits = []
+        best = 0
+        for ident in candidates:
+            label = self._texts[ident]
+            if self._paths[ident] is None or not all(word in label for word in words):
+                continue
+            name = label.rsplit(' / ', 1)[-1]
+            starts = name.startswith(text)
+            hits.append((not starts, text not in name, len(label), ident))
+            best += starts
+            if best >= limit or len(hits) >= self.max_candidates:
+                break
+        return [
+            (self._paths[ident], self._labels[ident])
+            for *_, ident in heapq.nsmallest(limit, hits)
+        ]
+
+
+class ThumbnailPool:
+    """Renders thumbnails on a bounded pool of worker threads.
+
+    The decoding itself happens in ffmpeg child processes, so plain threads
+    are enough to keep every core busy; ``workers`` caps how many run at
+    once. Results are handed to ``callback`` on the worker thread as soon as
+    each one finishes, so callers should emit a Qt signal from it. Jobs of a
+    cancelled ``token`` are dropped, whether still queued or already running.
+    """
+    def __init__(self, cache, workers=THUMBNAIL_WORKERS):
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix='thumbnail'
+        )
+
+    def _run(self, job, callback, token):
+        metrics.adjust('pool.queued', -1)
+        if token.cancelled:
+            return
+        metrics.adjust('pool.running', 1)
+        try:
+            result = job()
+        finally:
+            metrics.adjust('pool.running', -1)
+        if not token.cancelled:
+            callback(result)
+
+    def _dropped(self, future):
+        if future.cancelled():
+            # never started, so _run did not take it off the queue
+            metrics.adjust('pool.queued', -1)
+
+    def submit_job(self, job, callback, token):
+        """Run ``job()`` on the pool and pass its result to ``callback``."""
+        metrics.adjust('pool.queued', 1)
+        future = self.executor.submit(self._run, job, callback, token)
+        future.add_done_callback(self._dropped)
+        token.add_future(future)
+        return future
+
+    def submit(self, video_file, callback, token):
+        return self.submit_job(
+            partial(generate_thumbnail, video_file, self.cache, token=token),
+            callback, token
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ExportQueue(QObject):
+    """Runs clip exports in the background, EXPORT_WORKERS at a time.
+
+    Every job has its own ``CancelToken``; cancelling one kills its ffmpeg
+    and removes the partial file.
     """
-    heightChanged = pyqtSignal(int)
+    # job id, fraction done
+    progress = pyqtSignal(int, float)
+    # job id, output file
+    finished = pyqtSignal(int, str)
+    # job id, reason
+    failed = pyqtSignal(int, str)
 
-    def __init__(self, parent=None, margin=0, spacing=-1):
+    def __init__(self, catalog, workers=EXPORT_WORKERS, parent=None):
         super().__init__(parent)
-        if parent is not None:
-            self.setContentsMargins(margin, margin, margin, margin)
-        self.setSpacing(spacing)
+        self.catalog = catalog
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='export')
+        # job id -> token and future of the exports not done yet
+        self.jobs = {}
+        self.futures = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, camera, start, end, out_filename):
+        """Queue the export of ``camera`` from ``start`` to ``end`` (epoch
+        seconds) and return the job id."""
+        job = next(self._ids)
+        token = CancelToken(job)
+        self.jobs[job] = token
+        self.futures[job] = self.executor.submit(
+            self._run, job, camera, start, end, out_filename, token
+        )
+        return job
+
+    def _run(self, job, camera, start, end, out_filename, token):
+        # worker thread
+        try:
+            self.catalog.refresh(camera)
+            segments = export_segments(self.catalog.time_index(camera), start, end)
+            if not segments:
+                self.failed.emit(job, 'No recordings in this time range')
+                return
+            export_clip(segments, out_filename, end - start, token,
+                        lambda fraction: self.progress.emit(job, fraction))
+        except Cancelled:
+            self.failed.emit(job, 'Cancelled')
+        except DECODE_ERRORS as e:
+            self.failed.emit(job, failure_reason(e))
+        except Exception as e:  # pylint: disable=broad-except
+            # a catalog (sqlite3) error or a bug, the dialog must not be
+            # left waiting on a job that is gone
+            self.failed.emit(job, f'{type(e).__name__}: {e}')
+        else:
+            self.finished.emit(job, out_filename)
+        finally:
+            self.jobs.pop(job, None)
+            self.futures.pop(job, None)
+
+    def cancel(self, job):
+        token = self.jobs.pop(job, None)
+        future = self.futures.pop(job, None)
+        if future is not None and future.cancel():
+            # still queued, _run will not report it
+            self.failed.emit(job, 'Cancelled')
+        if token is not None:
+            token.cancel()
+
+    def shutdown(self):
+        for token in list(self.jobs.values()):
+            token.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ThumbnailThread(QThread):
+    """Lists the cameras of a branch folder for the grid.
+
+    A folder that holds recordings itself comes first, followed by each of
+    its subfolders; the grid's model renders their thumbnails on demand.
+    """
+    # the complete listing, once it is read to the end
+    update_widget = pyqtSignal(list, str, int)
+    # (position, rows, folder, generation) of cameras found so far, -1 appends
+    found = pyqtSignal(int, list, str, int)
+    # (folder, reason, generation) when the folder cannot be read at all
+    failed = pyqtSignal(str, str, int)
+    def __init__(self, video_dir, token):
+        QThread.__init__(self)
+        self.video_dir = video_dir
+        self.token = token
+        #self.update_widget = pyqtSignal(str)
+    
+    def __del__(self):
+        self.wait()
+
+    @metrics.timed('scan.cameras')
+    def run(self):
+        # a single pass over the folder, the entries already know whether
+        # they are files or folders; what is found goes out in batches so a
+        # slow share fills the grid as it answers
+        own = None
+        cameras = []
+        sent = 0
+        last_sent = time.perf_counter()
+        generation = self.token.generation
+        try:
+            with mount_limit(self.video_dir), os.scandir(self.video_dir) as entries:
+                for entry in entries:
+                    if self.token.cancelled:
+                        return
+                    try:
+                        if entry.is_dir():
+                            camera = os.path.normpath(entry.path)
+                            cameras.append((camera, os.path.basename(camera)))
+                        elif own is None and entry.is_file():
+                            camera = os.path.normcase(self.video_dir)
+                            own = (camera, os.path.basename(camera))
+                            self.found.emit(0, [own], self.video_dir, generation)
+                    except OSError:
+                        continue
+                    now = time.perf_counter()
+                    if len(cameras) > sent and now - last_sent >= SCAN_BATCH_SECONDS:
+                        self.found.emit(-1, cameras[sent:], self.video_dir, generation)
+                        sent = len(cameras)
+                        last_sent = now
+        except OSError as e:
+            self.failed.emit(self.video_dir, e.strerror or str(e), generation)
+            return
+        self.update_widget.emit(([own] if own else []) + cameras, self.video_dir, generation)
+
 
-        self._item_list = []
+class ListThumbnailThread(QThread):
+    """Lists a camera folder's recordings, newest first, for the strip.
 
+    Thumbnails are not rendered here; the strip's model asks for them as
+    rows scroll into view.
+    """
+    update_list_label = pyqtSignal(list, str, int)
+    def __init__(self, video_dir, token, catalog):
+        QThread.__init__(self)
+        self.video_dir = video_dir
+        self.token = token
+        self.catalog = catalog
+    
     def __del__(self):
-        while self.count():
-            self.takeAt(0)
+        self.wait()
+
+    @metrics.timed('scan.recordings')
+    def run(self):
+        self.catalog.refresh(self.video_dir)
+        if self.token.cancelled:
+            return
+        videoz = self.catalog.recordings(self.video_dir)
+        self.update_list_label.emit(videoz, self.video_dir, self.token.generation)
+
+
+class ThumbnailListModel(QAbstractListModel):
+    """Rows of folders or recordings whose thumbnails are rendered on demand.
+
+    Nothing is rendered up front: the view asks for the rows in and near its
+    viewport through ``request_thumbnails`` and each one is queued on the
+    pool once. Decoded pixmaps are kept in a bounded LRU, so memory does not
+    grow with the number of rows.
+    """
+    PathRole = Qt.ItemDataRole.UserRole
+    StateRole = Qt.ItemDataRole.UserRole + 1
+    PENDING, READY, MISSING = range(3)
 
-    def addItem(self, item):  # pylint: disable=invalid-name
-        self._item_list.append(item)
+    thumbnail_ready = pyqtSignal(str, object, int)
 
-    def addSpacing(self, size):  # pylint: disable=invalid-name
-        self.addItem(QSpacerItem(size, 0, QSizePolicy.Fixed, QSizePolicy.Minimum))
+    def __init__(self, pool, catalog=None, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.catalog = catalog
+        self.token = CancelToken()
+        # (path, label) per row
+        self._rows = []
+        self._row_of = {}
+        # path -> thumbnail file, None when rendering failed
+        self._thumbs = {}
+        self._requested = set()
+        self._pixmaps = OrderedDict()
+        self.thumbnail_ready.connect(self._thumbnail_ready)
 
-    def count(self):
-        return len(self._item_list)
+    def rowCount(self, parent=QModelIndex()):  # pylint: disable=invalid-name
+        return 0 if parent.isValid() else len(self._rows)
 
-    def itemAt(self, index):  # pylint: disable=invalid-name
-        if 0 <= index < len(self._item_list):
-            return self._item_list[index]
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        path, label = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return label
+        if role in (Qt.ItemDataRole.ToolTipRole, self.PathRole):
+            return path
+        if role == Qt.ItemDataRole.DecorationRole:
+            thumb = self._thumbs.get(path)
+            return self._pixmap(thumb) if thumb else None
+        if role == self.StateRole:
+            if path not in self._thumbs:
+                return self.PENDING
+            return self.READY if self._thumbs[path] else self.MISSING
         return None
 
-    def takeAt(self, index):  # pylint: disable=invalid-name
-        if 0 <= index < len(self._item_list):
-            return self._item_list.pop(index)
+    def path(self, row):
+        return self._rows[row][0]
+
+    def _pixmap(self, thumb):
+        pixmap = self._pixmaps.get(thumb)
+        if pixmap is None:
+            pixmap = thumbnail_pixmap(thumb)
+            self._pixmaps[thumb] = pixmap
+            if len(self._pixmaps) > PIXMAP_CACHE_ITEMS:
+                self._pixmaps.popitem(last=False)
+        else:
+            self._pixmaps.move_to_end(thumb)
+        return pixmap
+
+    def paths(self):
+        return [path for path, _ in self._rows]
+
+    def _reindex(self):
+        self._row_of = {path: row for row, (path, _) in enumerate(self._rows)}
+
+    def reset(self, token, rows=(), thumbnails=None):
+        """Replace all rows with ``(path, label)`` pairs of a new visit,
+        showing the ``thumbnails`` (path -> file) known from before until
+        fresh ones are rendered."""
+        self.beginResetModel()
+        self.token = token
+        self._rows = list(rows)
+        self._reindex()
+        self._thumbs.clear()
+        self._thumbs.update(thumbnails or {})
+        self._requested.clear()
+        self.endResetModel()
+
+    def thumbnails(self):
+        """Return the rendered thumbnail file of each row that has one."""
+        return {path: thumb for path, thumb in self._thumbs.items() if thumb}
+
+    def insert(self, position, rows):
+        """Insert ``(path, label)`` pairs before ``position``."""
+        rows = [row for row in rows if row[0] not in self._row_of]
+        if not rows:
+            return
+        position = max(0, min(position, len(self._rows)))
+        self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+        self._rows[position:position] = rows
+        self._reindex()
+        self.endInsertRows()
+
+    def remove(self, paths):
+        for path in paths:
+            row = self._row_of.get(path)
+            if row is None:
+                continue
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self._reindex()
+            self._thumbs.pop(path, None)
+            self._requested.discard(path)
+            self.endRemoveRows()
+
+    def refresh_thumbnail(self, path):
+        """Render the thumbnail of ``path`` again if it was shown before."""
+        if path not in self._requested:
+            return
+        self._requested.discard(path)
+        row = self._row_of.get(path)
+        if row is not None:
+            self.request_thumbnails(row, row)
+
+    def thumbnail_source(self, path):
+        """Return the recording to take the thumbnail of row ``path`` from."""
+        return path
+
+    def _render(self, path, token):
+        source = self.thumbnail_source(path)
+        if source is None:
+            return None
+        duration = None
+        if self.catalog is not None:
+            metadata = self.catalog.metadata(os.fspath(source))
+            duration = metadata[2] if metadata else None
+        return generate_thumbnail(source, self.pool.cache, token=token, duration=duration)
+
+    def request_thumbnails(self, first, last):
+        """Queue thumbnails for rows ``first`` to ``last`` not asked for yet."""
+        token = self.token
+        for row in range(max(first, 0), min(last, len(self._rows) - 1) + 1):
+            path = self._rows[row][0]
+            if path in self._requested:
+                continue
+            self._requested.add(path)
+            self.pool.submit_job(
+                partial(self._render, path, token),
+                partial(self._emit_ready, path, token.generation),
+                token
+            )
+
+    def _emit_ready(self, path, generation, thumb):
+        # runs on a pool thread, the signal hops over to the GUI thread
+        self.thumbnail_ready.emit(path, thumb, generation)
+
+    def _thumbnail_ready(self, path, thumb, generation):
+        if generation != self.token.generation:
+            return
+        self._thumbs[path] = thumb
+        row = self._row_of.get(path)
+        if row is not None:
+            index = self.index(row, 0)
+            self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole, self.StateRole])
+
+
+class CameraGridModel(ThumbnailListModel):
+    """Cameras of a branch, each shown with a thumbnail of its newest clip."""
+    def thumbnail_source(self, path):
+        if self.catalog is None:
+            return newest_recording(path)
+        self.catalog.refresh(path)
+        return self.catalog.newest(path)
+
+
+class FolderWatcher(QObject):
+    """Keeps the open branch and camera in step with the disk.
+
+    Change notifications are debounced and only the directories that
+    changed are refreshed in the catalog, off the GUI thread. New files are
+    reported once their size stopped growing for ``settle_interval``, so a
+    segment the camera is still writing does not show up half done.
+    """
+    # camera, [(path, ctime)] newest first
+    files_added = pyqtSignal(str, list)
+    files_removed = pyqtSignal(str, list)
+    folders_changed = pyqtSignal(str, list)
+    _refreshed = pyqtSignal(str, list, list, object, dict)
+    _settled = pyqtSignal(list, list, dict)
+
+    debounce_interval = 500
+    settle_interval = 2000
+
+    def __init__(self, pool, catalog, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.catalog = catalog
+        self.token = CancelToken()
+        self.branch = None
+        self.cameras = []
+        self.camera = None
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._directory_changed)
+        self._dirty = set()
+        # new file -> (directory, size at the last check)
+        self._pending = {}
+        self._checking = False
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.debounce_interval)
+        self._debounce.timeout.connect(self._flush)
+        self._settle = QTimer(self)
+        self._settle.setInterval(self.settle_interval)
+        self._settle.timeout.connect(self._check_pending)
+        self._refreshed.connect(self._on_refreshed)
+        self._settled.connect(self._on_settled)
+
+    def watch_branch(self, branch, cameras):
+        self.branch = branch
+        self.cameras = list(cameras)
+        self._rewatch()
+
+    def watch_camera(self, camera):
+        self.camera = camera
+        self._rewatch()
+
+    def stop(self):
+        self.token.cancel()
+        self._debounce.stop()
+        self._settle.stop()
+
+    def _watched(self):
+        wanted = set(self.cameras)
+        wanted.update(path for path in (self.branch, self.camera) if path)
+        return wanted
+
+    def _rewatch(self):
+        wanted = self._watched()
+        current = set(self._watcher.directories())
+        if current - wanted:
+            self._watcher.removePaths(list(current - wanted))
+        if wanted - current:
+            self._watcher.addPaths(list(wanted - current))
+        self._pending = {
+            path: value for path, value in self._pending.items() if value[0] in wanted
+        }
+
+    def _directory_changed(self, path):
+        self._dirty.add(path)
+        self._debounce.start()
+
+    def _flush(self):
+        dirty, self._dirty = self._dirty, set()
+        for path in dirty:
+            self.pool.submit_job(
+                partial(self._refresh, path, path == self.branch),
+                lambda result: self._refreshed.emit(*result), self.token
+            )
+
+    def _refresh(self, path, is_branch):
+        # runs on a pool thread
+        added, removed = self.catalog.refresh(path)
+        subdirs = None
+        if is_branch:
+            try:
+                subdirs = [
+                    os.path.normpath(entry.path) for entry in scan_directory(path) if entry.is_dir()
+                ]
+            except OSError:
+                subdirs = []
+        sizes = {}
+        for video in added:
+            try:
+                sizes[video] = os.path.getsize(video)
+            except OSError:
+                pass
+        return path, added, removed, subdirs, sizes
+
+    def _on_refreshed(self, path, added, removed, subdirs, sizes):
+        if path not in self._watched():
+            return
+        for video in removed:
+            self._pending.pop(video, None)
+        if removed:
+            self.files_removed.emit(path, removed)
+        for video, size in sizes.items():
+            self._pending[video] = (path, size)
+        if self._pending and not self._settle.isActive():
+            self._settle.start()
+        if subdirs is not None:
+            self.folders_changed.emit(path, subdirs)
+
+    def _check_pending(self):
+        if self._checking:
+            return
+        if not self._pending:
+            self._settle.stop()
+            return
+        self._checking = True
+        future = self.pool.submit_job(
+            partial(self._stat_pending, dict(self._pending)),
+            lambda result: self._settled.emit(*result), self.token
+        )
+        future.add_done_callback(self._check_done)
+
+    def _check_done(self, future):
+        # a check that raised or was dropped never reports back, clear the
+        # way for the next one all the same
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            self._settled.emit([], [], {})
+
+    def _stat_pending(self, pending):
+        # runs on a pool thread
+        completed, gone, grown = [], [], {}
+        for video, (path, size) in pending.items():
+            try:
+                stat = os.stat(video)
+            except OSError:
+                gone.append(video)
+                continue
+            current = stat.st_size
+            if current == size and current > 0:
+                try:
+                    self.catalog.touch(video)
+                    completed.append((path, video, stat.st_ctime))
+                except OSError:
+                    gone.append(video)
+            else:
+                grown[video] = current
+        return completed, gone, grown
+
+    def _on_settled(self, completed, gone, grown):
+        self._checking = False
+        for video in gone:
+            self._pending.pop(video, None)
+        for video, size in grown.items():
+            if video in self._pending:
+                self._pending[video] = (self._pending[video][0], size)
+        added = {}
+        for path, video, ctime in sorted(completed, key=lambda item: item[2], reverse=True):
+            if self._pending.pop(video, None) is not None:
+                added.setdefault(path, []).append((video, ctime))
+        for path, videos in added.items():
+            self.files_added.emit(path, videos)
+        if not self._pending:
+            self._settle.stop()
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Paints a thumbnail, with an optional caption below it, straight onto
+    the view instead of creating widgets per row."""
+    margin = 6
+    caption_height = 20
+
+    def __init__(self, caption=False, parent=None):
+        super().__init__(parent)
+        self.caption = caption
+
+    def sizeHint(self, option, index):  # pylint: disable=invalid-name
+        width = THUMBNAIL_SIZE[0] + 2 * self.margin
+        height = THUMBNAIL_SIZE[1] + 2 * self.margin
+        if self.caption:
+            width += 40
+            height += self.caption_height
+        return QSize(width, height)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        rect = option.rect
+        thumb_rect = QRect(
+            rect.x() + (rect.width() - THUMBNAIL_SIZE[0]) // 2,
+            rect.y() + self.margin, *THUMBNAIL_SIZE
+        )
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is not None:
+            painter.drawPixmap(thumb_rect, pixmap)
+        else:
+            painter.fillRect(thumb_rect, QColor('#D0D0D0'))
+            if index.data(ThumbnailListModel.StateRole) == ThumbnailListModel.MISSING:
+                painter.drawText(thumb_rect, Qt.AlignmentFlag.AlignCenter, "No data")
+        if option.state & (QStyle.StateFlag.State_MouseOver | QStyle.StateFlag.State_Selected):
+            painter.setPen(QPen(QColor('#000000'), 3))
+            painter.drawRect(thumb_rect.adjusted(1, 1, -2, -2))
+        if self.caption:
+            caption_rect = QRect(
+                rect.x(), thumb_rect.bottom() + 1, rect.width(), self.caption_height
+            )
+            text = option.fontMetrics.elidedText(
+                index.data(Qt.ItemDataRole.DisplayRole) or '',
+                Qt.TextElideMode.ElideMiddle, caption_rect.width() - 4
+            )
+            painter.setPen(option.palette.color(option.palette.ColorRole.Text))
+            painter.drawText(caption_rect, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
+
+
+class ThumbnailView(QListView):
+    """``QListView`` over a ``ThumbnailListModel`` that only asks for the
+    thumbnails of rows in, or ``prefetch`` rows around, its viewport."""
+    prefetch = 8
+
+    def __init__(self, caption=False, parent=None):
+        super().__init__(parent)
+        # coalesce bursts of scroll/layout events into one request
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.setInterval(25)
+        self._request_timer.timeout.connect(self.request_visible)
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setItemDelegate(ThumbnailDelegate(caption, self))
+        self.setHorizontalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.horizontalScrollBar().valueChanged.connect(self.schedule_request)
+        self.verticalScrollBar().valueChanged.connect(self.schedule_request)
+
+    def setModel(self, model):  # pylint: disable=invalid-name
+        super().setModel(model)
+        model.modelReset.connect(self.schedule_request)
+        model.rowsInserted.connect(self.schedule_request)
+        model.layoutChanged.connect(self.schedule_request)
+
+    def schedule_request(self, *args):
+        self._request_timer.start()
+
+    def updateGeometries(self):  # pylint: disable=invalid-name
+        # called once the rows are laid out, their rectangles are valid now
+        super().updateGeometries()
+        self.schedule_request()
+
+    def showEvent(self, e):  # pylint: disable=invalid-name
+        super().showEvent(e)
+        self.schedule_request()
+
+    def visible_rows(self):
+        """Return the ``(first, last)`` rows intersecting the viewport, or
+        ``None``. Rows are laid out in order, so both ends are found by
+        bisecting on their rectangles."""
+        model = self.model()
+        count = model.rowCount() if model is not None else 0
+        if not count or not self.isVisible():
+            return None
+        # rows advance downwards when wrapping left to right, else sideways
+        vertical = self.isWrapping() == (self.flow() == QListView.Flow.LeftToRight)
+        limit = self.viewport().height() if vertical else self.viewport().width()
+
+        def bounds(row):
+            rect = self.visualRect(model.index(row, 0))
+            if vertical:
+                return rect.top(), rect.bottom()
+            return rect.left(), rect.right()
+
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bounds(mid)[1] < 0:
+                lo = mid + 1
+            else:
+                hi = mid
+        first = lo
+        hi = count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bounds(mid)[0] <= limit:
+                lo = mid + 1
+            else:
+                hi = mid
+        last = lo - 1
+        if first >= count or last < first:
+            return None
+        return first, last
+
+    def request_visible(self):
+        rows = self.visible_rows()
+        if rows is not None:
+            self.model().request_thumbnails(rows[0] - self.prefetch, rows[1] + self.prefetch)
+
+
+def _has_subdirectory(path, limit=None):
+    """Tell whether ``path`` holds a folder, looking at no more than
+    TREE_PEEK_ENTRIES entries; camera folders are all files and would
+    otherwise be read to the end."""
+    try:
+        with limit or mount_limit(path), os.scandir(path) as entries:
+            for entry in itertools.islice(entries, TREE_PEEK_ENTRIES):
+                if entry.is_dir():
+                    return True
+    except OSError:
+        pass
+    return False
+
+
+def list_subdirectories(path):
+    """Return ``(has_files, folders)`` of ``path``, ``folders`` being sorted
+    ``(name, path, has_subdirectories)`` tuples."""
+    has_files = False
+    folders = []
+    limit = mount_limit(path)
+    for entry in scan_directory(path, limit):
+        if entry.is_dir():
+            folders.append((entry.name, os.path.normpath(entry.path)))
+        else:
+            has_files = True
+    folders.sort(key=lambda folder: folder[0].lower())
+    # one peek per folder, a round trip each on a share, so they overlap
+    peeks = scan_executor.map(
+        partial(_has_subdirectory, limit=limit), [folder for _, folder in folders]
+    )
+    return has_files, [(name, folder, peek) for (name, folder), peek in zip(folders, peeks)]
+
+
+class _TreeNode:
+    __slots__ = (
+        'name', 'path', 'parent', 'children', 'has_children', 'has_files', 'loading', 'number'
+    )
+
+    def __init__(self, name, path, parent=None, has_children=True):
+        self.name = name
+        self.path = path
+        self.parent = parent
+        # None until the folder was listed
+        self.children = None
+        self.has_children = has_children
+        self.has_files = None
+        self.loading = False
+        # position among the parent's children, kept by the model
+        self.number = 0
+
+    def row(self):
+        return self.number
+
+
+def _renumber(children, start=0):
+    for number in range(start, len(children)):
+        children[number].number = number
+
+
+class CameraTreeModel(QAbstractItemModel):
+    """Folder tree under a camera root, listed lazily off the GUI thread.
+
+    A folder's children are only read when the view expands it
+    (``fetchMore``), by a background worker; listings are cached with the
+    folder's mtime, so expanding again shows the cached children at once and
+    the worker only re-reads folders that changed. Nothing here touches the
+    disk on the GUI thread.
+    """
+    # path, mtime_ns, (has_files, folders), generation
+    listed = pyqtSignal(str, object, object, int)
+    # a folder asked for with reveal() is loaded
+    revealed = pyqtSignal(QModelIndex)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root = None
+        self.generation = 0
+        self._nodes = {}
+        # path -> (mtime_ns, (has_files, folders))
+        self._listings = {}
+        self._icon = None
+        self._reveal = None
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='tree')
+        self.listed.connect(self._listed)
+
+    def set_root(self, path):
+        self.beginResetModel()
+        self.generation += 1
+        self._reveal = None
+        path = os.path.normpath(path)
+        self.root = _TreeNode(os.path.basename(path) or path, path)
+        self._nodes = {path: self.root}
+        self.endResetModel()
+
+    def _node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if node is None or node.children is None or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer().parent
+        if node is None or node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row(), 0, node)
+
+    def rowCount(self, parent=QModelIndex()):  # pylint: disable=invalid-name
+        node = self._node(parent)
+        return len(node.children) if node is not None and node.children else 0
+
+    def columnCount(self, parent=QModelIndex()):  # pylint: disable=invalid-name
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):  # pylint: disable=invalid-name
+        node = self._node(parent)
+        if node is None:
+            return False
+        if node.children is not None:
+            return bool(node.children)
+        return node.has_children
+
+    def canFetchMore(self, parent):  # pylint: disable=invalid-name
+        node = self._node(parent)
+        return node is not None and node.children is None and not node.loading
+
+    def fetchMore(self, parent):  # pylint: disable=invalid-name
+        if not self.canFetchMore(parent):
+            return
+        node = self._node(parent)
+        node.loading = True
+        cached = self._listings.get(node.path)
+        if cached is not None:
+            self._apply(node, cached[1])
+        self._list(node.path)
+
+    def _list(self, path):
+        cached = self._listings.get(path)
+        self.executor.submit(
+            self._read, path, cached[0] if cached else None, self.generation
+        )
+
+    def _read(self, path, known_mtime, generation):
+        # worker thread
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if mtime == known_mtime:
+                listing = None
+            else:
+                listing = list_subdirectories(path)
+        except OSError:
+            mtime, listing = None, (False, [])
+        self.listed.emit(path, mtime, listing, generation)
+
+    def _listed(self, path, mtime, listing, generation):
+        if generation != self.generation:
+            return
+        node = self._nodes.get(path)
+        if listing is None:
+            # unchanged since the cached listing
+            if node is not None:
+                node.loading = False
+            return
+        self._listings[path] = (mtime, listing)
+        if node is not None:
+            self._apply(node, listing)
+            node.loading = False
+        self._continue_reveal()
+
+    def _apply(self, node, listing):
+        has_files, folders = listing
+        node.has_files = has_files
+        index = QModelIndex() if node is self.root else self.createIndex(node.row(), 0, node)
+        if not node.children:
+            # first listing, in one go
+            node.children = []
+            if folders:
+                self.beginInsertRows(index, 0, len(folders) - 1)
+                for number, (name, path, has_children) in enumerate(folders):
+                    child = _TreeNode(name, path, node, has_children)
+                    child.number = number
+                    node.children.append(child)
+                    self._nodes[path] = child
+                self.endInsertRows()
+            elif index.isValid():
+                # the expand arrow goes away
+                self.dataChanged.emit(index, index)
+            return
+        wanted = {path: has_children for _, path, has_children in folders}
+        children = node.children
+        # drop folders that went away, a run of neighbours at a time
+        row = len(children)
+        while row > 0:
+            row -= 1
+            if children[row].path in wanted:
+                children[row].has_children = wanted[children[row].path] or bool(children[row].children)
+                continue
+            last = row
+            while row > 0 and children[row - 1].path not in wanted:
+                row -= 1
+            self.beginRemoveRows(index, row, last)
+            for child in children[row:last + 1]:
+                self._forget(child)
+            del children[row:last + 1]
+            _renumber(children, row)
+            self.endRemoveRows()
+        # then merge in the new ones; both lists are sorted the same way, so
+        # one pass finds where each run of new folders goes
+        known = self._nodes
+        row = 0
+        added = []
+
+        def flush():
+            nonlocal row, added
+            if added:
+                self.beginInsertRows(index, row, row + len(added) - 1)
+                children[row:row] = added
+                _renumber(children, row)
+                self.endInsertRows()
+                row += len(added)
+                added = []
+        for name, path, has_children in folders:
+            child = known.get(path)
+            if child is not None and child.parent is node:
+                flush()
+                row = child.number + 1
+                continue
+            child = _TreeNode(name, path, node, has_children)
+            self._nodes[path] = child
+            added.append(child)
+        flush()
+
+    def _forget(self, node):
+        self._nodes.pop(node.path, None)
+        for child in node.children or ():
+            self._forget(child)
+
+    def refresh(self, path):
+        """Re-read ``path`` if it was listed before, e.g. after it changed."""
+        node = self._nodes.get(os.path.normpath(path))
+        if node is not None and node.children is not None:
+            self._list(node.path)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return node.path
+        if role == Qt.ItemDataRole.DecorationRole:
+            if self._icon is None:
+                self._icon = QtWidgets.QApplication.style().standardIcon(
+                    QStyle.StandardPixmap.SP_DirIcon
+                )
+            return self._icon
         return None
 
-    def expandingDirections(self):  # pylint: disable=invalid-name,no-self-use
-        return Qt.Orientations(Qt.Orientation(0))
+    def path(self, index):
+        node = self._node(index)
+        return node.path if node is not None else None
 
-    def hasHeightForWidth(self):  # pylint: disable=invalid-name,no-self-use
-        return True
+    def has_files(self, index):
+        """Whether the folder holds recordings, ``None`` until it was listed."""
+        node = self._node(index)
+        return node.has_files if node is not None else None
+
+    def index_of(self, path):
+        """Return the index of ``path``, or of its deepest ancestor that is
+        loaded already, starting the listings needed to reach it."""
+        path = os.path.normpath(path)
+        node = self._nodes.get(path)
+        probe = path
+        while node is None:
+            parent = os.path.dirname(probe)
+            if parent == probe:
+                return QModelIndex()
+            probe = parent
+            node = self._nodes.get(probe)
+        index = QModelIndex() if node is self.root else self.createIndex(node.row(), 0, node)
+        if node.path != path and self.canFetchMore(index):
+            self.fetchMore(index)
+        return index
+
+    def reveal(self, path):
+        """List the folders down to ``path`` one after the other in the
+        background and emit ``revealed`` once ``path`` is in the tree."""
+        self._reveal = os.path.normpath(path)
+        self._continue_reveal()
+
+    def _continue_reveal(self):
+        if self._reveal is None or self.root is None:
+            return
+        index = self.index_of(self._reveal)
+        if index.isValid() and index.internalPointer().path == self._reveal:
+            self._reveal = None
+            self.revealed.emit(index)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class MyTreeView(QTreeView):
+    #expanded = pyqtSignal()
+    def __init__(self):
+        super().__init__()
+        self.setExpandsOnDoubleClick(False)
+        #self.expanded.connect(self.rexpand)
+
+    def mousePressEvent(self, e):
+        pos = e.position()
+        clickedIndex = self.indexAt(pos.toPoint())
+        if clickedIndex.isValid():
+            vrect = self.visualRect(clickedIndex)
+            itemIdentation = vrect.x() - self.visualRect(self.rootIndex()).x()
+            if e.position().x() < itemIdentation:
+                # known from the background listing, unknown counts as empty
+                if not self.model().has_files(clickedIndex):
+                    if not self.isExpanded(clickedIndex):
+                        self.expand(clickedIndex)
+                    else:
+                        self.collapse(clickedIndex)
+                return
+            return super().mousePressEvent(e)
+
+
+
+def review_options(rate):
+    """Return the libvlc media options for playing at ``rate``."""
+    for threshold, options in REVIEW_DECODE_OPTIONS:
+        if rate >= threshold:
+            return options
+    return ()
+
+
+_vlc_instance = None
+
+
+def vlc_instance():
+    """Return the libvlc instance all players share, created on first use
+    since loading libvlc and its plugins is the slowest part of startup."""
+    global _vlc_instance
+    if _vlc_instance is None:
+        with metrics.span('vlc.init'):
+            _vlc_instance = vlc.Instance()
+    return _vlc_instance
+
+
+class PlayerEvents(QObject):
+    """Re-emits a media player's libvlc events as Qt signals.
+
+    libvlc calls back on its own threads, and must not be called into from
+    there; the signals are queued onto the GUI thread instead, so the UI
+    follows the player without polling it.
+    """
+    position_changed = pyqtSignal(float)
+    # seconds, once the demuxer knows the media's duration
+    length_changed = pyqtSignal(float)
+    playing = pyqtSignal()
+    paused = pyqtSignal()
+    stopped = pyqtSignal()
+    end_reached = pyqtSignal()
+    error = pyqtSignal()
+
+    def __init__(self, player, parent=None):
+        super().__init__(parent)
+        # the callbacks live as long as this manager object, keep it around
+        self._manager = manager = player.event_manager()
+        events = vlc.EventType
+        manager.event_attach(events.MediaPlayerPositionChanged, self._on_position_changed)
+        manager.event_attach(events.MediaPlayerLengthChanged, self._on_length_changed)
+        manager.event_attach(events.MediaPlayerPlaying, lambda event: self.playing.emit())
+        manager.event_attach(events.MediaPlayerPaused, lambda event: self.paused.emit())
+        manager.event_attach(events.MediaPlayerStopped, lambda event: self.stopped.emit())
+        manager.event_attach(events.MediaPlayerEndReached, lambda event: self.end_reached.emit())
+        manager.event_attach(events.MediaPlayerEncounteredError, lambda event: self.error.emit())
+
+    def _on_position_changed(self, event):
+        self.position_changed.emit(event.u.new_position)
+
+    def _on_length_changed(self, event):
+        if event.u.new_length > 0:
+            self.length_changed.emit(event.u.new_length / 1000)
+
+
+class PlaybackQueue(QObject):
+    """Feeds a media player the segments of a camera one after the other.
+
+    While a segment plays the next one is already opened and parsed by
+    libvlc in the background, and it is swapped in from the player's
+    end-of-media event instead of being discovered by polling.
+    """
+    advanced = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    # ms libvlc may spend parsing a preloaded segment
+    parse_timeout = 5000
+
+    def __init__(self, instance, player, events, parent=None):
+        super().__init__(parent)
+        self.instance = instance
+        self.player = player
+        self.media_list = iter(())
+        self.next_path = None
+        self.next_media = None
+        # (histogram, perf_counter) of a switch waiting for the player to start
+        self.pending_start = None
+        # review speed, kept from one segment to the next
+        self.rate = 1
+        self.options = ()
+        events.end_reached.connect(self.advance)
+        events.playing.connect(self._started)
 
-    def heightForWidth(self, width):  # pylint: disable=invalid-name
-        height = self._do_layout(QRect(0, 0, width, 0), True)
-        return height
+    def _open(self, path, *options):
+        media = self.instance.media_new(path, *self.options, *options)
+        with metrics.span('vlc.parse_request'):
+            media.parse_with_options(vlc.MediaParseFlag.local, self.parse_timeout)
+        return media
 
-    def setGeometry(self, rect):  # pylint: disable=invalid-name
-        super().setGeometry(rect)
-        self._do_layout(rect, False)
+    def _started(self):
+        if self.pending_start is not None:
+            name, started = self.pending_start
+            metrics.observe(name, time.perf_counter() - started)
+            self.pending_start = None
 
-    def sizeHint(self):  # pylint: disable=invalid-name
-        return self.minimumSize()
+    def open(self, path, offset=None):
+        """Load ``path`` into the player, parsing it in the background and
+        starting ``offset`` seconds in when given."""
+        options = [f':start-time={offset:.3f}'] if offset else []
+        media = self._open(path, *options)
+        self.player.set_media(media)
+        self.pending_start = ('player.open', time.perf_counter())
+        return media
 
-    def minimumSize(self):  # pylint: disable=invalid-name
-        size = QSize()
+    def set_rate(self, rate):
+        """Play at ``rate`` with the decoder options it needs. Returns
+        whether those changed, the current media then has to be reopened as
+        options only apply when a media is opened."""
+        self.rate = rate
+        self.player.set_rate(rate)
+        options = review_options(rate)
+        if options == self.options:
+            return False
+        self.options = options
+        if self.next_path is not None:
+            self.next_media = self._open(self.next_path)
+        return True
 
-        for item in self._item_list:
-            minsize = item.minimumSize()
-            extent = item.geometry().bottomRight()
-            size = size.expandedTo(QSize(minsize.width(), extent.y()))
+    def set_list(self, media_list):
+        """Play ``media_list`` once the current segment ends."""
+        self.media_list = iter(media_list)
+        self.preload()
 
-        margin = self.contentsMargins().left()
-        size += QSize(2 * margin, 2 * margin)
-        return size
+    def preload(self):
+        try:
+            self.next_path = next(self.media_list)
+        except StopIteration:
+            self.next_path = None
+            self.next_media = None
+            return
+        self.next_media = self._open(self.next_path)
 
-    def _do_layout(self, rect, test_only=False):
-        m = self.contentsMargins()
-        effective_rect = rect.adjusted(+m.left(), +m.top(), -m.right(), -m.bottom())
-        x = effective_rect.x()
-        y = effective_rect.y()
-        line_height = 0
+    def advance(self):
+        if self.next_media is None:
+            self.finished.emit()
+            return
+        media, path = self.next_media, self.next_path
+        self.pending_start = ('player.switch', time.perf_counter())
+        self.player.set_media(media)
+        self.player.play()
+        if self.rate != 1:
+            self.player.set_rate(self.rate)
+        self.preload()
+        self.advanced.emit(path)
 
-        for item in self._item_list:
-            wid = item.widget()
 
-            space_x = self.spacing()
-            space_y = self.spacing()
-            if wid is not None:
-                space_x += wid.style().layoutSpacing(
-                    QSizePolicy.ControlTypes.PushButton, QSizePolicy.ControlTypes.PushButton, Qt.Orientations.Horizontal)
-                space_y += wid.style().layoutSpacing(
-                    QSizePolicy.ControlTypes.PushButton, QSizePolicy.ControlTypes.PushButton, Qt.Orientations.Vertical)
+class MosaicTile(QFrame):
+    """One camera of the mosaic, with a media player of its own."""
+    focus_requested = pyqtSignal(object)
 
-            next_x = x + item.sizeHint().width() + space_x
-            if next_x - space_x > effective_rect.right() and line_height > 0:
-                x = effective_rect.x()
-                y = y + line_height + space_y
-                next_x = x + item.sizeHint().width() + space_x
-                line_height = 0
+    def __init__(self, instance, camera, parent=None):
+        super().__init__(parent)
+        self.instance = instance
+        self.camera = camera
+        self.path = None
+        self.focused = False
+        self.player = instance.media_player_new()
+        self.video = QFrame()
+        self.video.setStyleSheet("background-color: black;")
+        self.label = QLabel(os.path.basename(camera))
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+        layout.addWidget(self.video, 1)
+        layout.addWidget(self.label)
+        self.player.set_hwnd(int(self.video.winId()))
+        self.setStyleSheet("MosaicTile { border: 2px solid transparent; }")
 
-            if not test_only:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+    def mouseDoubleClickEvent(self, e):
+        self.focus_requested.emit(self)
 
-            x = next_x
-            line_height = max(line_height, item.sizeHint().height())
+    def open(self, path, offset, playing):
+        """Open ``path`` already seeked to ``offset`` seconds."""
+        options = [f':start-time={offset:.3f}']
+        if not self.focused:
+            options.extend(MOSAIC_BACKGROUND_OPTIONS)
+        self.player.set_media(self.instance.media_new(path, *options))
+        self.path = path
+        self.label.setText(f"{os.path.basename(self.camera)} - {os.path.basename(path)}")
+        if playing:
+            self.player.play()
 
-        new_height = y + line_height - rect.y()
-        self.heightChanged.emit(new_height)
-        return new_height
+    def sync(self, path, offset, playing):
+        """Follow the wall clock: switch segments, pause along and re-seek
+        when the player has drifted too far from it."""
+        if path is None:
+            if self.path is not None:
+                self.player.stop()
+                self.path = None
+                self.label.setText(f"{os.path.basename(self.camera)} - no recording")
+            return
+        if path != self.path:
+            self.open(path, offset, playing)
+            return
+        if playing != bool(self.player.is_playing()):
+            if playing:
+                self.player.play()
+            else:
+                self.player.set_pause(1)
+        current = self.player.get_time()
+        if current >= 0 and abs(current / 1000 - offset) > MOSAIC_MAX_DRIFT:
+            self.player.set_time(int(offset * 1000))
 
+    def set_focused(self, focused, offset, playing):
+        if focused == self.focused:
+            return
+        self.focused = focused
+        self.setStyleSheet(
+            "MosaicTile { border: 2px solid %s; }" % ('#0078D4' if focused else 'transparent')
+        )
+        if self.path is not None:
+            # decoding options are fixed per media, reopen at the same moment
+            self.open(self.path, offset, playing)
 
-class Slider(QtWidgets.QSlider):
-    # seek = pyqtSignal()
-    def mousePressEvent(self, e):
-        if e.button() == Qt.MouseButtons.LeftButton:
-            e.accept()
-            x = e.position().x()
-            value = (self.maximum() - self.minimum()) * x / self.width() + self.minimum()
-            self.setValue(int(value))
-            self.sliderMoved.emit(int(value))
-            #self.seek.emit()
-        else:
-            return super().mousePressEvent(self, e)
+    def release(self):
+        self.player.stop()
+        self.player.release()
 
 
-class ThumbFrame(QLabel):
-    clicked = pyqtSignal()
+class MosaicView(QWidget):
+    """Plays several cameras side by side, all showing the same moment.
 
-    def mouseDoubleClickEvent(self, a0):
-        self.clicked.emit()
+    A wall clock drives the tiles: each tick resolves which segment of each
+    camera covers the clock's time through the camera's time index, and
+    tiles that wandered off are seeked back. Only the focused tile decodes
+    at full quality, the rest run with MOSAIC_BACKGROUND_OPTIONS. The
+    cameras' time indexes are brought up to date on ``pool`` before the
+    tiles open.
+    """
+    closed = pyqtSignal()
+    # cameras, start, generation of a finished open() preparation
+    prepared = pyqtSignal(list, float, int)
 
+    # ms between two clock ticks
+    sync_interval = 1000
 
-def generate_thumbnail(in_filename, out_filename):
-    try:
-        probe = ffmpeg.probe(in_filename.path)
-        time = float(probe['streams'][0]['duration']) // 2
-        width = probe['streams'][0]['width']
-        (
-            ffmpeg
-            .input(in_filename, ss=time)
-            .filter('scale', width, -1)
-            .output(out_filename, vframes=1)
-            .overwrite_output()
-            .run(capture_stdout=True, capture_stderr=True)
-        )
-        return out_filename
-    except Exception as e:
-        pass
+    def __init__(self, catalog, pool, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+        self.pool = pool
+        self.generations = itertools.count(1)
+        self.token = CancelToken()
+        self.tiles = []
+        self.focused = None
+        # wall clock time at the last play/pause/seek, and when that was
+        self.origin = 0.0
+        self.started = None
+        self.back_button = QPushButton("Back")
+        self.back_button.clicked.connect(self.close_mosaic)
+        self.play_button = QPushButton("Pause")
+        self.play_button.clicked.connect(self.toggle)
+        self.clock_label = QLabel()
+        bar = QHBoxLayout()
+        bar.addWidget(self.back_button)
+        bar.addStretch()
+        bar.addWidget(self.clock_label)
+        bar.addStretch()
+        bar.addWidget(self.play_button)
+        self.grid = QGridLayout()
+        self.grid.setSpacing(2)
+        layout = QVBoxLayout(self)
+        layout.addLayout(bar)
+        layout.addLayout(self.grid, 1)
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(self.sync_interval)
+        self.sync_timer.timeout.connect(self.sync)
+        self.prepared.connect(self._open_tiles)
 
+    def now(self):
+        if self.started is None:
+            return self.origin
+        return self.origin + time.monotonic() - self.started
 
-def clearLayout(layout):
-    for i in reversed(range(layout.count())):
-        layout.itemAt(i).widget().deleteLater()
+    @property
+    def playing(self):
+        return self.started is not None
 
-def generate_media_list(directory: str, cur_media=None, include=False):
-    media_list = sorted([file.path for file in os.scandir(directory)], key=os.path.getctime, reverse=True)
-    if cur_media:
-        try:
-            media_index = media_list.index(cur_media)
-            if include:
-                media_list = media_list[media_index:]
-            else:
-                media_list = media_list[media_index+1:]
-        except ValueError:
-            pass
-    for file in media_list:
-        yield file
+    def open(self, cameras, start=None):
+        """Show ``cameras`` from the wall clock time ``start``, by default
+        the latest moment all of them have footage for."""
+        self.release_tiles()
+        self.token = CancelToken(next(self.generations))
+        generation = self.token.generation
+        self.clock_label.setText("Loading...")
+        self.pool.submit_job(
+            partial(self._prepare, cameras[:MOSAIC_MAX_TILES], start, self.token),
+            lambda result: self.prepared.emit(*result, generation), self.token
+        )
 
+    def _prepare(self, cameras, start, token):
+        # pool thread
+        newest = []
+        for camera in cameras:
+            token.check()
+            self.catalog.refresh(camera)
+            index = self.catalog.time_index(camera)
+            if len(index):
+                newest.append(index.starts[-1])
+        if start is None:
+            start = min(newest) if newest else time.time()
+        return cameras, float(start)
 
-class ThumbnailThread(QThread):
-    update_widget = pyqtSignal(tuple, str, int)
-    update_list_label = pyqtSignal(tuple, str)
-    def __init__(self, video_dir, thumb_dir):
-        QThread.__init__(self)
-        self.video_dir = video_dir
-        self.thumb_dir = thumb_dir
-        #self.update_widget = pyqtSignal(str)
-    
-    def __del__(self):
-        self.wait()
-    
-    def _generate_video_thumbnail(self, video_file):
-        identifier = randint(1, 100000000)
-        name = f'{identifier}.png'
-        thumb_file = os.path.join(self.thumb_dir.name, name)
-        thumb_nail = generate_thumbnail(video_file, thumb_file)
-        return thumb_nail
+    def _open_tiles(self, cameras, start, generation):
+        if generation != self.token.generation:
+            return
+        columns = max(1, int(len(cameras) ** 0.5 + 0.999))
+        for number, camera in enumerate(cameras):
+            tile = MosaicTile(vlc_instance(), camera, self)
+            tile.focus_requested.connect(self.focus)
+            self.grid.addWidget(tile, number // columns, number % columns)
+            self.tiles.append(tile)
+        self.origin = start
+        self.started = time.monotonic()
+        self.play_button.setText("Pause")
+        self.sync()
+        self.sync_timer.start()
 
-    def run(self):
-        folderz = len(list(os.scandir(self.video_dir)))
-        vids = [vid for vid in os.scandir(self.video_dir) if os.path.isfile(vid) ]
-        if vids:
-            try:
-                thub_nail = self._generate_video_thumbnail(vids[0])
-                self.update_widget.emit((thub_nail, os.path.normcase(self.video_dir)), self.video_dir, folderz)
-            except IndexError:
-                pass
-        for file in os.scandir(self.video_dir):
-            if os.path.isdir(file):
-                sorted_videos = sorted(os.scandir(file), key=os.path.getctime, reverse=True)
-                try:
-                    thub_nail = self._generate_video_thumbnail(sorted_videos[0])
-                    self.update_widget.emit((thub_nail, os.path.normpath(file.path)), self.video_dir, folderz)
-                except IndexError:
-                    self.update_widget.emit((None, os.path.normpath(file.path)), self.video_dir, folderz)
+    def sync(self):
+        t = self.now()
+        self.clock_label.setText(QDateTime.fromSecsSinceEpoch(int(t)).toString('yyyy-MM-dd hh:mm:ss'))
+        for tile in self.tiles:
+            tile.sync(*self.resolve(tile.camera, t), self.playing)
 
+    def resolve(self, camera, t):
+        """Return the recording of ``camera`` running at ``t`` and how far
+        into it ``t`` is, or ``(None, 0)`` in a gap."""
+        index = self.catalog.time_index(camera)
+        position = index.locate(t)
+        if position is None:
+            return None, 0.0
+        return index.paths[position], t - index.starts[position]
 
+    def toggle(self):
+        if self.playing:
+            self.origin = self.now()
+            self.started = None
+            self.play_button.setText("Play")
+        else:
+            self.started = time.monotonic()
+            self.play_button.setText("Pause")
+        self.sync()
 
-class ListThumbnailThread(QThread):
-    update_list_label = pyqtSignal(tuple, str, int)
-    def __init__(self, video_dir, thumb_dir):
-        QThread.__init__(self)
-        self.video_dir = video_dir
-        self.thumb_dir = thumb_dir
-        #self.update_widget = pyqtSignal(str)
-    
-    def __del__(self):
-        self.wait()
-    
-    def _generate_video_thumbnail(self, video_file):
-        identifier = randint(1, 100000000)
-        name = f'{identifier}.png'
-        thumb_file = os.path.join(self.thumb_dir.name, name)
-        thumb_nail = generate_thumbnail(video_file, thumb_file)
-        return thumb_nail
+    def seek(self, t):
+        self.origin = t
+        if self.playing:
+            self.started = time.monotonic()
+        self.sync()
 
-    def run(self):
-        videoz = [vid for vid in os.scandir(self.video_dir) if os.path.isfile(vid) ]
-        for file in sorted(os.scandir(self.video_dir), key=os.path.getctime, reverse=True):
-            if os.path.isfile(file):
-                thub_nail = self._generate_video_thumbnail(file)
-                self.update_list_label.emit((thub_nail, file.path), self.video_dir, len(videoz))
+    def focus(self, focused):
+        t = self.now()
+        self.focused = None if focused is self.focused else focused
+        for tile in self.tiles:
+            offset = self.resolve(tile.camera, t)[1]
+            tile.set_focused(tile is self.focused, offset, self.playing)
 
+    def release_tiles(self):
+        self.token.cancel()
+        self.sync_timer.stop()
+        for tile in self.tiles:
+            tile.release()
+            self.grid.removeWidget(tile)
+            tile.deleteLater()
+        self.tiles = []
+        self.focused = None
 
-class FileSystemModel(QFileSystemModel):
-    def hasChildren(self, parent):
-        file_info = self.fileInfo(parent)
-        _dir = QDir(file_info.absoluteFilePath())
-        return bool(_dir.entryList(self.filter()))
+    def close_mosaic(self):
+        self.release_tiles()
+        self.closed.emit()
 
 
-file_model = FileSystemModel()
+class ExportDialog(QDialog):
+    """Asks for the time range and the file of a clip export."""
+    def __init__(self, camera, start, end, out_filename, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Export Clip')
+        self.from_edit = QDateTimeEdit(QDateTime.fromSecsSinceEpoch(int(start)))
+        self.to_edit = QDateTimeEdit(QDateTime.fromSecsSinceEpoch(int(end)))
+        for edit in (self.from_edit, self.to_edit):
+            edit.setDisplayFormat('yyyy-MM-dd hh:mm:ss')
+            edit.setCalendarPopup(True)
+        self.path_edit = QLineEdit(out_filename)
+        browse = QPushButton("Browse...")
+        browse.clicked.connect(self.browse)
+        path_row = QHBoxLayout()
+        path_row.addWidget(self.path_edit, 1)
+        path_row.addWidget(browse)
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout = QFormLayout(self)
+        layout.addRow("Camera", QLabel(os.path.basename(camera)))
+        layout.addRow("From", self.from_edit)
+        layout.addRow("To", self.to_edit)
+        layout.addRow("File", path_row)
+        layout.addRow(buttons)
 
+    def browse(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export clip', self.path_edit.text())
+        if path:
+            self.path_edit.setText(path)
 
-class MyTreeView(QTreeView):
-    #expanded = pyqtSignal()
-    def __init__(self):
-        super().__init__()
-        self.setExpandsOnDoubleClick(False)
-        #self.expanded.connect(self.rexpand)
+    def accept(self):
+        if self.range()[1] <= self.range()[0] or not self.path_edit.text().strip():
+            return
+        super().accept()
 
-    def mousePressEvent(self, e):
-        pos = e.position()
-        clickedIndex = self.indexAt(pos.toPoint())
-        if clickedIndex.isValid():
-            vrect = self.visualRect(clickedIndex)
-            itemIdentation = vrect.x() - self.visualRect(self.rootIndex()).x()
-            if e.position().x() < itemIdentation:
-                path = file_model.fileInfo(clickedIndex).absoluteFilePath()
-                if not list(os.walk(path))[0][2]:
-                    if not self.isExpanded(clickedIndex):
-                        self.expand(clickedIndex)
-                        s
-                    else:
-                        self.collapse(clickedIndex)
-                return
-            return super().mousePressEvent(e)
+    def range(self):
+        return (self.from_edit.dateTime().toSecsSinceEpoch(),
+                self.to_edit.dateTime().toSecsSinceEpoch())
 
+    def path(self):
+        return self.path_edit.text().strip()
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    branch_index_ready = pyqtSignal(object, int)
+    storyboard_ready = pyqtSignal(str, object, int)
+    activity_ready = pyqtSignal(str, object, int)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle('Remote CAM Controller')
         self.setGeometry(0, 0, 900, 900)
         self.set_ui()
+        self.restore_session()
 
     def set_ui(self):
         self.widget = QtWidgets.QWidget(self)
@@ -316,11 +3143,31 @@ class MainWindow(QtWidgets.QMainWindow):
         select_folder_action.triggered.connect(self.onMyToolBarButtonClick)
         # about_action = QAction(QIcon("assets\\help.png"), "About", self)
         # info_action = QAction(QIcon("assets\\info.png"), "How To", self)
+        # plays the cameras selected in the grid side by side
+        mosaic_action = QAction("Mosaic", self)
+        mosaic_action.setStatusTip("Play the selected cameras together")
+        mosaic_action.triggered.connect(self.open_mosaic)
         toolbar.addAction(select_folder_action)
+        toolbar.addAction(mosaic_action)
         menu = self.menuBar()
         file_menu = menu.addMenu("&File")
         # help_menu = menu.addMenu("&Help")
         file_menu.addAction(select_folder_action)
+        file_menu.addAction(mosaic_action)
+        export_action = QAction("Export Clip...", self)
+        export_action.setStatusTip("Save a time range of a camera to one file")
+        export_action.triggered.connect(self.export_clip_dialog)
+        file_menu.addAction(export_action)
+        # where the time goes, shown live or saved for later
+        export_metrics_action = QAction("Export Metrics...", self)
+        export_metrics_action.triggered.connect(self.export_metrics)
+        file_menu.addAction(export_metrics_action)
+        overlay_action = QAction("Performance Overlay", self)
+        overlay_action.setShortcut(QtGui.QKeySequence("F12"))
+        overlay_action.setCheckable(True)
+        overlay_action.toggled.connect(self.toggle_metrics_overlay)
+        view_menu = menu.addMenu("&View")
+        view_menu.addAction(overlay_action)
         # help_menu.addActions([about_action, info_action])
         # top area(little space)
         self.topframe = QFrame()
@@ -329,16 +3176,31 @@ class MainWindow(QtWidgets.QMainWindow):
         # assign those areas to the screen(self.body)
         self.body.addWidget(self.topframe, 5)
         self.body.addWidget(self.bottomframe, 95)
-        # instanciate video
-        self.instance = vlc.Instance()
+        # libvlc is loaded the first time something is played, see
+        # init_player, so the window comes up without waiting for it
         self.media = None
-        # create an empty vlc media player
-        self.mediaplayer = self.instance.media_player_new()
+        self._mediaplayer = None
+        self._playback = None
+        self.is_playing = False
         #self.media_list = vlc.MediaList()
         # self.media_list = []
         self.is_paused = False
-        # set a temporary directory
-        self.temp_dir = tempfile.TemporaryDirectory()
+        # thumbnails survive restarts in an on-disk cache
+        self.thumbnail_cache = ThumbnailCache(THUMBNAIL_CACHE_DIR)
+        self.thumbnail_pool = ThumbnailPool(self.thumbnail_cache)
+        self.catalog = RecordingCatalog()
+        # new and deleted recordings show up without clicking the folder again
+        self.watcher = FolderWatcher(self.thumbnail_pool, self.catalog, self)
+        self.watcher.files_added.connect(self.recordings_added)
+        self.watcher.files_removed.connect(self.recordings_removed)
+        self.watcher.folders_changed.connect(self.cameras_changed)
+        self.list_dir = None
+        # every folder visit gets a fresh token, cancelling the previous one
+        self.generations = itertools.count(1)
+        self.grid_token = CancelToken()
+        self.list_token = CancelToken()
+        # probing the open camera's recordings, outlives date filter changes
+        self.metadata_token = CancelToken()
         # keep track od directories
         self.cur_dir = None
         # set the spacing
@@ -348,8 +3210,10 @@ class MainWindow(QtWidgets.QMainWindow):
         #file_model.setFilter(QDir.Dirs|QDir.NoDotAndDotDot)
         #file_model.setRootPath('')
         self.fileview = QTreeView()
-        
-        self.fileview.setModel(file_model)
+        # folders are listed in the background as they are expanded
+        self.tree_model = CameraTreeModel(self)
+        self.tree_model.revealed.connect(self.select_tree_index)
+        self.fileview.setModel(self.tree_model)
         self.fileview.setColumnWidth(0, 200)
         self.fileview.setAnimated(True)
         self.fileview.setHeaderHidden(True)
@@ -360,9 +3224,25 @@ class MainWindow(QtWidgets.QMainWindow):
         self.twobx = QVBoxLayout(self.wrapperwig)
         self.twobx.setSpacing(0)
         self.search_box = QLineEdit()
-        self.search_box.setPlaceholderText("Search Branches")
+        # words of one or two letters match the start of a word, longer ones
+        # anywhere in a folder name
+        self.search_box.setPlaceholderText("Search Branches (short words match word starts)")
         self.twobx.addWidget(self.search_box)
         self.twobx.addWidget(self.fileview)
+        # search results replace the tree while there is a query
+        self.branch_index = None
+        self.index_token = CancelToken()
+        self.branch_index_ready.connect(self.set_branch_index)
+        self.search_hits = []
+        self.search_model = QStringListModel()
+        self.search_results = QListView()
+        self.search_results.setModel(self.search_model)
+        self.search_results.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
+        self.search_results.setUniformItemSizes(True)
+        self.search_results.clicked.connect(self.open_search_result)
+        self.search_results.hide()
+        self.twobx.addWidget(self.search_results)
+        self.search_box.textChanged.connect(self.search_branches)
 
         # define the video thumbnail view
         self.rightview = QWidget()
@@ -370,8 +3250,16 @@ class MainWindow(QtWidgets.QMainWindow):
         self.rightview2 = QWidget()
         #self.rightview2.hide()
         self.mainview.setContentsMargins(0,0,0,0)
-        # use the flowlayout to accomodate and self balance
-        self.mainframe = FlowLayout(self.rightview)
+        # camera grid, wraps like a flow layout but only lays out and paints
+        # the cameras that are scrolled into view
+        self.grid_model = CameraGridModel(self.thumbnail_pool, self.catalog, self)
+        self.mainframe = ThumbnailView(caption=True)
+        self.mainframe.setFlow(QListView.Flow.LeftToRight)
+        self.mainframe.setWrapping(True)
+        self.mainframe.setResizeMode(QListView.ResizeMode.Adjust)
+        self.mainframe.setModel(self.grid_model)
+        self.mainframe.setSelectionMode(QListView.SelectionMode.ExtendedSelection)
+        self.mainframe.doubleClicked.connect(self.play_grid_index)
 
         # test thumbnail placeholder
         mv = QWidget()
@@ -398,20 +3286,21 @@ class MainWindow(QtWidgets.QMainWindow):
         self.page_frame = QVBoxLayout()
         self.rightview2.setLayout(self.page_frame)
 
-        # set layout for view
-        self.rightview.setLayout(self.mainframe)
-        # make right view scrollable
-        scroller = QtWidgets.QScrollArea()
-        scroller.setWidgetResizable(True)
-        scroller.setWidget(self.rightview)
-        scroller.setContentsMargins(0,0,0,0)
+        # set layout for view, the grid scrolls by itself
+        self.rightview_layout = QVBoxLayout(self.rightview)
+        self.rightview_layout.setContentsMargins(0,0,0,0)
+        self.rightview_layout.addWidget(self.mainframe)
         scroller2 = QtWidgets.QScrollArea()
         scroller2.setWidgetResizable(True)
         scroller2.setWidget(self.rightview2)
         # add the widgets to screen
         self.stackedWidget = QStackedWidget()
-        self.stackedWidget.addWidget(scroller)
+        self.stackedWidget.addWidget(self.rightview)
         self.stackedWidget.addWidget(scroller2)
+        # several cameras at once, sharing the vlc instance of the player
+        self.mosaic = MosaicView(self.catalog, self.thumbnail_pool)
+        self.mosaic.closed.connect(lambda: self.stackedWidget.setCurrentIndex(0))
+        self.stackedWidget.addWidget(self.mosaic)
         self.mainview.addWidget(self.wrapperwig, 30)
         self.mainview.addWidget(self.stackedWidget, 70) # make it take 70% of screen
         #self.mainview.addWidget(self.rightview2, 70)
@@ -426,8 +3315,13 @@ class MainWindow(QtWidgets.QMainWindow):
         self.slider_frame_layout = QVBoxLayout()
         self.slider_frame = QFrame()
         self.slider_frame.setLayout(self.slider_frame_layout)
-        self.list_label = QListWidget()
-        self.list_label.setFlow(QListView.Flow(0))
+        # the strip only renders thumbnails of recordings scrolled into view
+        self.list_model = ThumbnailListModel(self.thumbnail_pool, self.catalog, self)
+        self.list_label = ThumbnailView()
+        self.list_label.setFlow(QListView.Flow.LeftToRight)
+        self.list_label.setWrapping(False)
+        self.list_label.setModel(self.list_model)
+        self.list_label.doubleClicked.connect(self.play_list_index)
         # for i in range(8):
         #     itm = QListWidgetItem(self.list_label)
         #     btn = QLabel()
@@ -440,13 +3334,52 @@ class MainWindow(QtWidgets.QMainWindow):
         #     self.list_label.addItem(itm)
         #     self.list_label.setItemWidget(itm, btn)
         self.list_label.setContentsMargins(10,10,10,10)
+        self.list_label.setFixedHeight(
+            THUMBNAIL_SIZE[1] + 2 * ThumbnailDelegate.margin
+            + self.list_label.horizontalScrollBar().sizeHint().height()
+            + 2 * self.list_label.frameWidth()
+        )
         
 
         self.date_range_lay = QHBoxLayout()
-        self.date_range = QDateEdit()
+        self.date_range = QDateEdit(QDate.currentDate())
+        self.date_range.setCalendarPopup(True)
+        self.time_from = QTimeEdit(QTime(0, 0))
+        self.date_range_to = QDateEdit(QDate.currentDate())
+        self.date_range_to.setCalendarPopup(True)
+        self.time_to = QTimeEdit(QTime(23, 59))
+        self.clear_range_button = QPushButton("All")
+        self.clear_range_button.clicked.connect(self.clear_date_filter)
+        # the range applies as soon as one of its ends is edited
+        self.date_filter = None
+        for edit in (self.date_range, self.time_from, self.date_range_to, self.time_to):
+            edit.editingFinished.connect(self.apply_date_filter)
         self.date_range_lay.addStretch()
+        self.date_range_lay.addWidget(QLabel("From"))
         self.date_range_lay.addWidget(self.date_range)
+        self.date_range_lay.addWidget(self.time_from)
+        self.date_range_lay.addWidget(QLabel("To"))
+        self.date_range_lay.addWidget(self.date_range_to)
+        self.date_range_lay.addWidget(self.time_to)
+        self.date_range_lay.addWidget(self.clear_range_button)
         self.slider_frame_layout.addLayout(self.date_range_lay)
+        # the open camera's recordings on one axis, seekable by wall clock
+        self.timeline_lay = QHBoxLayout()
+        self.timeline = TimelineBar()
+        self.timeline.seek_requested.connect(self.seek_to)
+        self.seek_time = QDateTimeEdit(QDateTime.currentDateTime())
+        self.seek_time.setDisplayFormat('yyyy-MM-dd hh:mm:ss')
+        self.seek_time.setCalendarPopup(True)
+        self.seek_button = QPushButton("Go")
+        self.seek_button.clicked.connect(
+            lambda: self.seek_to(self.seek_time.dateTime().toSecsSinceEpoch())
+        )
+        self.current_start = None
+        self.current_length = SEGMENT_SECONDS
+        self.timeline_lay.addWidget(self.timeline, 1)
+        self.timeline_lay.addWidget(self.seek_time)
+        self.timeline_lay.addWidget(self.seek_button)
+        self.slider_frame_layout.addLayout(self.timeline_lay)
         self.slider_frame_layout.addWidget(self.list_label)
         self.listSlider = QSlider(Qt.Orientations.Horizontal)
         self.listSlider.setRange(0, 10)
@@ -460,6 +3393,20 @@ class MainWindow(QtWidgets.QMainWindow):
         self.positionSlider = Slider(Qt.Orientations.Horizontal)
         self.positionSlider.setMaximum(1000)
         self.positionSlider.sliderMoved.connect(self.set_position)
+        self.seek_started = None
+        # hovering the slider previews the frame under the mouse
+        self.current_path = None
+        # camera opened before the catalog knew any of its recordings
+        self.pending_camera = None
+        self.storyboard = None
+        self.storyboard_token = CancelToken()
+        self.storyboard_ready.connect(self.set_storyboard)
+        self.storyboard_popup = QLabel(self, Qt.WindowType.ToolTip)
+        self.positionSlider.hovered.connect(self.show_storyboard_frame)
+        self.positionSlider.left.connect(self.storyboard_popup.hide)
+        # activity heatmap along the slider, analysed in the background
+        self.activity = b''
+        self.activity_ready.connect(self.set_activity)
         # self.positionSlider.sliderPressed.connect(self.set_position)
         #self.positionSlider.seek.connect(self.set_position)
         #self.positionSlider.setFocusPolicy(Qt.NoFocus)
@@ -470,6 +3417,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.playbutton = QPushButton()
         self.fwdbutton = QPushButton()
         self.rwdbutton = QPushButton()
+        self.ratebutton = QPushButton("1x")
+        self.ratebutton.setToolTip("Review speed")
+        self.ratebutton.clicked.connect(self.cycle_rate)
+        self.eventbutton = QPushButton("Next event")
+        self.eventbutton.setToolTip("Jump to where activity starts next")
+        self.eventbutton.clicked.connect(self.jump_to_next_event)
         self.enlargebutton = QPushButton()
         self.enlargebutton.clicked.connect(self.go_full_screen)
         self.menubutton = QPushButton()
@@ -502,6 +3455,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.hbuttonbox.addWidget(self.rwdbutton)
         self.hbuttonbox.addWidget(self.playbutton)
         self.hbuttonbox.addWidget(self.fwdbutton)
+        self.hbuttonbox.addWidget(self.eventbutton)
+        self.hbuttonbox.addWidget(self.ratebutton)
         self.hbuttonbox.addStretch()
         self.hbuttonbox.addWidget(self.enlargebutton)
         self.hbuttonbox.addWidget(self.menubutton)
@@ -516,22 +3471,46 @@ class MainWindow(QtWidgets.QMainWindow):
         self.page_frame.addWidget(self.screen_frame, 60)
         self.page_frame.addWidget(self.slider_frame, 40)
 
-        self.timer = QTimer(self)
-        self.timer.setInterval(100)
-        self.timer.timeout.connect(self.update_ui)
     
         # adjust margin
         self.rightview.setContentsMargins(25,0,0,0)
         # set object name to make css targetting easier
         self.widget.setLayout(self.body)
         self.setCentralWidget(self.widget)
+        self.metrics_overlay = QLabel(self)
+        self.metrics_overlay.setObjectName('metrics_overlay')
+        self.metrics_overlay.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: white; "
+            "font-family: monospace; padding: 6px;"
+        )
+        self.metrics_overlay.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.metrics_overlay.hide()
+        # clip exports, listed in a dock while any are around
+        self.exports = ExportQueue(self.catalog, parent=self)
+        self.exports.progress.connect(self.export_progress)
+        self.exports.finished.connect(self.export_finished)
+        self.exports.failed.connect(self.export_failed)
+        self.export_items = {}
+        self.export_list = QListWidget()
+        cancel_export = QPushButton("Cancel")
+        cancel_export.clicked.connect(self.cancel_export)
+        exports_panel = QWidget()
+        exports_layout = QVBoxLayout(exports_panel)
+        exports_layout.addWidget(self.export_list)
+        exports_layout.addWidget(cancel_export)
+        self.export_dock = QDockWidget("Exports", self)
+        self.export_dock.setWidget(exports_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.export_dock)
+        self.export_dock.hide()
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.setInterval(1000)
+        self.metrics_timer.timeout.connect(self.refresh_metrics_overlay)
         self.fileview.setObjectName('fv')
         self.rightview.setObjectName('rightview')
         self.mainview.setObjectName('mainview')
-        self.mainframe.setObjectName('mainframe')
         self.wrapperwig.setObjectName('wrapper')
         self.search_box.setObjectName('search_box')
-        scroller.setObjectName('mini')
+        self.mainframe.setObjectName('mini')
         scroller2.setObjectName('mini2')
         self.speakerbutton.setObjectName("playb")
         self.playbutton.setObjectName("playb")
@@ -539,6 +3518,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.messagebutton.setObjectName("playb")
         self.rwdbutton.setObjectName("playb")
         self.fwdbutton.setObjectName("playb")
+        self.eventbutton.setObjectName("playb")
+        self.ratebutton.setObjectName("playb")
         self.enlargebutton.setObjectName("playb")
         self.menubutton.setObjectName("playb")
         self.backbutton.setObjectName("nav")
@@ -634,24 +3615,49 @@ class MainWindow(QtWidgets.QMainWindow):
         }
         """)
     
+    def init_player(self):
+        """Create the media player and what drives it."""
+        # instanciate video
+        # create an empty vlc media player
+        self._mediaplayer = vlc_instance().media_player_new()
+        # the player tells us when its state changes, nothing polls it
+        self.player_events = PlayerEvents(self._mediaplayer, self)
+        self.player_events.position_changed.connect(self.update_ui)
+        self.player_events.length_changed.connect(self.set_current_length)
+        self.player_events.playing.connect(self.player_playing)
+        self.player_events.paused.connect(self.player_paused)
+        self.player_events.stopped.connect(self.player_stopped)
+        self.player_events.error.connect(self.player_error)
+        # moves on to the next segment as soon as one ends
+        self._playback = PlaybackQueue(vlc_instance(), self._mediaplayer, self.player_events, self)
+        self._playback.advanced.connect(self.segment_started)
+        self._playback.finished.connect(self.stop)
+
+    @property
+    def mediaplayer(self):
+        if self._mediaplayer is None:
+            self.init_player()
+        return self._mediaplayer
+
+    @property
+    def playback(self):
+        if self._playback is None:
+            self.init_player()
+        return self._playback
+
     def play_pause(self):
         """
         Toggle play/pause status
         """
         
         
-        if self.mediaplayer.is_playing():
+        # the icon follows once the player reports its new state
+        if self.is_playing:
             self.mediaplayer.pause()
-            self.playbutton.setIcon(self.play_icon)
             self.is_paused = True
-            self.timer.stop()
-            
         else:
             self.mediaplayer.play()
-            sleep(0.5)
-            self.playbutton.setIcon(self.pause_icon)
             self.is_paused = False
-            self.timer.start()
     
     def set_mute_status(self):
         """
@@ -710,12 +3716,48 @@ class MainWindow(QtWidgets.QMainWindow):
     def onMyToolBarButtonClick(self):
         dialog = QtWidgets.QFileDialog()
         folder_path = dialog.getExistingDirectory(None, 'select the content Folder')
-        file_model.setRootPath(folder_path)
-        file_model.setFilter(QDir.Filters.AllDirs|QDir.Filters.NoDotAndDotDot)
+        if folder_path:
+            self.tree_model.set_root(folder_path)
+            self.build_branch_index(folder_path)
+
+    def build_branch_index(self, root):
+        self.index_token.cancel()
+        self.index_token = CancelToken(next(self.generations))
+        generation = self.index_token.generation
+        self.branch_index = None
+        self.thumbnail_pool.submit_job(
+            partial(BranchIndex.build, root, self.index_token),
+            lambda index: self.branch_index_ready.emit(index, generation),
+            self.index_token
+        )
+
+    def set_branch_index(self, index, generation):
+        if generation != self.index_token.generation:
+            return
+        self.branch_index = index
+        self.search_branches(self.search_box.text())
+
+    def search_branches(self, text):
+        if not text.strip():
+            self.search_results.hide()
+            self.fileview.show()
+            return
+        if self.branch_index is None:
+            self.search_hits = []
+            self.search_model.setStringList(["Indexing branches..."])
+        else:
+            hits = self.branch_index.search(text)
+            self.search_hits = [path for path, _ in hits]
+            self.search_model.setStringList([label for _, label in hits])
+        self.fileview.hide()
+        self.search_results.show()
 
-        self.fileview.setRootIndex(file_model.index(folder_path))
-        # for col in range(1, file_model.columnCount()):
-        #     self.fileview.hideColumn(col)
+    def open_search_result(self, index):
+        if index.row() >= len(self.search_hits):
+            return
+        path = self.search_hits[index.row()]
+        self.tree_model.reveal(path)
+        self.open_folder(path)
         
 
     def go_back(self):
@@ -724,14 +3766,16 @@ class MainWindow(QtWidgets.QMainWindow):
             self.page_frame.addWidget(self.screen_frame, 60)
             self.screen_frame.showNormal()
             return
+        if self.stackedWidget.currentIndex() == 2:
+            self.mosaic.close_mosaic()
+            return
         if self.stackedWidget.currentIndex() == 1:
             self.stackedWidget.setCurrentIndex(0)
-            if self.mediaplayer.is_playing():
+            if self.is_playing:
                 self.mediaplayer.stop()
                 self.playbutton.setIcon(self.play_icon)
                 #self.is_paused = True
                 self.positionSlider.setValue(0)
-                self.timer.stop()
     
     def play_thumbnail(self, dd):
         if self.stackedWidget.currentIndex() == 0:
@@ -741,32 +3785,33 @@ class MainWindow(QtWidgets.QMainWindow):
         cam_label = dd[1].split('\\')
         #path_folder = os.path.dirname(path)
         
-        self.media_list = generate_media_list(path)
+        self.video_label.setText(f"<h1>{cam_label[-1]}</h1>")
+        self.date_filter = None
+        self.list_token.cancel()
+        self.list_token = CancelToken(next(self.generations))
+        self.list_model.reset(self.list_token)
+        # the list thread brings the catalog up to date in the background
+        self.list_thread = ListThumbnailThread(path, self.list_token, self.catalog)
+        self.list_thread.update_list_label.connect(self.update_list_label)
+        self.list_thread.start()
+        media_list = generate_media_list(path, catalog=self.catalog)
         # for video in os.scandir(path):
         #     print(video)
         #     self.media_list.add_media(self.instance.media_new(video))
         
         #self.mediaplayer.set_media_list(self.media_list)
         #m_inst = self.mediaplayer.get_media_player()
-        print(dd[1])
-        try:
-            self.media = self.instance.media_new(self.media_list.__next__())
-        except StopIteration:
-            return
-        self.mediaplayer.set_media(self.media)
+        first = next(media_list, None)
+        # not in the catalog yet, start once the list thread read it
+        self.pending_camera = path if first is None else None
+        if first is not None:
+            self.start_playback(first, media_list)
+
+    def start_playback(self, first, media_list):
+        self.media = self.playback.open(first)
+        self.load_storyboard(first)
         self.mediaplayer.set_hwnd(int(self.player_frame.winId()))
-        self.media.parse()
-        self.video_label.setText(f"<h1>{cam_label[-1]}</h1>")
-        try:
-            if self.generate_thread.isRunning():
-                self.generate_thread.terminate()
-        except:
-            pass
-        thumb_dir = self.temp_dir
-        path_folder = os.path.dirname(path)
-        self.generate_thread = ListThumbnailThread(path,thumb_dir)
-        self.generate_thread.update_list_label.connect(self.update_list_label)
-        self.generate_thread.start()
+        self.playback.set_list(media_list)
 
     def play_list_thumbnail(self, dd):
         if self.stackedWidget.currentIndex() == 0:
@@ -776,17 +3821,22 @@ class MainWindow(QtWidgets.QMainWindow):
         cam_label = dd[1].split('\\')
         path_folder = os.path.dirname(path)
         
-        self.media_list = generate_media_list(path_folder, path, include=True)
+        if self.date_filter is not None and path in self.list_model.paths():
+            # keep playing inside the selected range
+            videos = self.list_model.paths()
+            media_list = videos[videos.index(path) + 1:]
+        else:
+            media_list = generate_media_list(path_folder, path, catalog=self.catalog)
         # for video in os.scandir(path):
         #     print(video)
         #     self.media_list.add_media(self.instance.media_new(video))
         
         #self.mediaplayer.set_media_list(self.media_list)
         #m_inst = self.mediaplayer.get_media_player()
-        self.media = self.instance.media_new(path)
-        self.mediaplayer.set_media(self.media)
+        self.media = self.playback.open(path)
+        self.load_storyboard(path)
         self.mediaplayer.set_hwnd(int(self.player_frame.winId()))
-        self.media.parse()
+        self.playback.set_list(media_list)
         # self.video_label.setText(f"<h1>{cam_label[-1]}</h1>")
         # try:
         #     if self.generate_thread.isRunning():
@@ -799,140 +3849,353 @@ class MainWindow(QtWidgets.QMainWindow):
         # self.generate_thread.update_list_label.connect(self.update_list_label)
         # self.generate_thread.start()
 
-    def update_list_label(self, obj, dir, length):
-        if self.cur_dir != dir:
-            self.list_label.clear()
-        elif self.cur_dir == dir:
-            if self.list_label.count() == length:
-                return
-        self.cur_dir = dir
-        im = QPixmap(obj[0])
-        sized_img = im.scaled(111, 111, Qt.AspectRatioMode.IgnoreAspectRatio)
-        itm = QListWidgetItem(self.list_label)
-        btn = ThumbFrame("Bloom")
-        btn.setAccessibleDescription(obj[1])
-        btn.clicked.connect(partial(self.play_list_thumbnail, obj))
-        btn.setFixedSize(111, 111)
-        btn.setPixmap(sized_img)
-        itm.setSizeHint(btn.sizeHint())
-        wrapper_layout = QVBoxLayout()
-        wrapper_widget = QWidget()
-        wrapper_layout.addWidget(btn)
-        wrapper_widget.setLayout(wrapper_layout)
-        wrapper_widget.setObjectName('plate')
-        self.list_label.addItem(itm)
-        self.list_label.setItemWidget(itm, btn)
-        self.list_label.setFixedHeight(btn.height())
-        # for i in range(8):
-        #     itm = QListWidgetItem(self.list_label)
-        #     btn = QLabel()
-        #     btn.setFixedSize(111, 111)
-        #     btn.setPixmap(sized_img)
-        #     #btn.setLayout(bxr)
-        #     #bxr.addWidget(btn)
-        #     itm.setSizeHint(btn.sizeHint())
-        
-        #     self.list_label.addItem(itm)
-        #     self.list_label.setItemWidget(itm, btn)
+    def play_list_index(self, index):
+        self.play_list_thumbnail((None, self.list_model.path(index.row())))
 
-    def update_widget(self, obj, dir, length):
-        if self.cur_dir != dir:
-            clearLayout(self.mainframe)
-        elif self.cur_dir == dir:
-            if self.mainframe.count() == length:
-                return
-        self.cur_dir = dir
-        if obj[0]:
-            im = QPixmap(obj[0])
-            sized_img = im.scaled(111, 111, Qt.AspectRatioMode.IgnoreAspectRatio)
-            btn = ThumbFrame("Bloom")
-            btn.setAccessibleDescription(obj[1])
-            btn.clicked.connect(partial(self.play_thumbnail, obj))
-            btn.setFixedSize(111, 111)
-            btn.setPixmap(sized_img)
+    @metrics.timed('ui.update_list_label')
+    def update_list_label(self, videos, dir, generation):
+        if generation != self.list_token.generation:
+            # late listing of a camera that is no longer open
+            return
+        self.list_model.reset(
+            self.list_token, [(video, os.path.basename(video)) for video in videos]
+        )
+        self.list_dir = dir
+        self.timeline.set_index(self.catalog.time_index(dir))
+        self.watcher.watch_camera(dir)
+        if self.pending_camera == dir and videos:
+            self.pending_camera = None
+            self.start_playback(videos[0], videos[1:])
+        # probe durations etc. of new segments in the background; the date
+        # filter replaces list_token, this one only goes with the camera
+        self.metadata_token.cancel()
+        self.metadata_token = CancelToken(next(self.generations))
+        self.thumbnail_pool.submit_job(
+            partial(self.catalog.fill_metadata, dir, self.metadata_token,
+                    self.thumbnail_cache.failures),
+            lambda result: None, self.metadata_token
+        )
+
+    def play_grid_index(self, index):
+        self.play_thumbnail((None, self.grid_model.path(index.row())))
+
+    def open_mosaic(self):
+        """Play the cameras selected in the grid together, from the start
+        of the date range if one is set, else from the latest moment all
+        of them have footage for."""
+        rows = sorted(index.row() for index in self.mainframe.selectionModel().selectedIndexes())
+        cameras = [self.grid_model.path(row) for row in rows]
+        if not cameras:
+            self.statusBar().showMessage("Select the cameras to play in the grid first", 5000)
+            return
+        start = self.date_filter[0] if self.date_filter is not None else None
+        if self.is_playing:
+            self.mediaplayer.pause()
+        self.stackedWidget.setCurrentIndex(2)
+        self.mosaic.open(cameras, start)
+
+    def scan_branch(self, path, cameras=(), thumbnails=None):
+        """List the cameras of ``path`` into the grid in the background,
+        showing ``cameras`` (and their ``thumbnails``) from an earlier visit
+        meanwhile."""
+        # stop the previous folder's jobs and drop whatever they still send
+        self.grid_token.cancel()
+        self.grid_token = CancelToken(next(self.generations))
+        self.grid_model.reset(self.grid_token, cameras, thumbnails)
+        self.cur_dir = path
+        self.generate_thread = ThumbnailThread(path, self.grid_token)
+        self.generate_thread.update_widget.connect(self.update_widget)
+        self.generate_thread.found.connect(self.add_cameras)
+        self.generate_thread.failed.connect(self.branch_failed)
+        self.generate_thread.start()
+
+    def branch_failed(self, dir, reason, generation):
+        """The folder (e.g. one restored from the last session) is gone or
+        unreachable: drop what the grid showed of it and say so."""
+        if generation != self.grid_token.generation:
+            return
+        self.grid_model.reset(self.grid_token)
+        # not worth restoring next time either
+        self.cur_dir = None
+        self.statusBar().showMessage(f"Cannot open {dir}: {reason}", 10000)
+
+    def add_cameras(self, position, cameras, dir, generation):
+        """Show cameras of the folder being listed before the listing ends."""
+        if generation != self.grid_token.generation:
+            return
+        if position < 0:
+            position = self.grid_model.rowCount()
+        self.grid_model.insert(position, cameras)
+
+    @metrics.timed('ui.update_widget')
+    def update_widget(self, cameras, dir, generation):
+        if generation != self.grid_token.generation:
+            # late listing of a folder that is no longer shown
+            return
+        known = self.grid_model.paths()
+        if known:
+            # restored from the last session, only apply what changed
+            listed = {camera for camera, _ in cameras}
+            self.grid_model.remove([camera for camera in known if camera not in listed])
+            known = set(known)
+            self.grid_model.insert(
+                self.grid_model.rowCount(), [row for row in cameras if row[0] not in known]
+            )
         else:
-            btn = ThumbFrame("No data")
-            btn.setAlignment(Qt.Alignment.AlignCenter)
-            btn.setAccessibleDescription(obj[1])
-            btn.clicked.connect(partial(self.play_thumbnail, obj))
-            btn.setFixedSize(111, 111)
-        # btn.setStyleSheet("::hover"
-        #                     "{"
-        #                     "border : 5px solid green;"
-        #                     "}")
-        cam_label = obj[1].split('\\')
-        #print(cam_label)
-        label = QLabel(cam_label[-1])
-        wrapper_layout = QVBoxLayout()
-        wrapper_widget = QWidget()
-        wrapper_layout.addWidget(btn, 70, Qt.Alignment.AlignCenter)
-        wrapper_layout.addWidget(label, 30, Qt.Alignment.AlignCenter)
-        wrapper_widget.setLayout(wrapper_layout)
-        wrapper_widget.setObjectName('plate')
-        self.mainframe.addWidget(wrapper_widget)
-    
-    def block_thread_signal(self):
-        self.fileview.blockSignals(True)
-    
-    def release_thread_signal(self):
-        self.fileview.blockSignals(False)
+            self.grid_model.reset(self.grid_token, cameras)
+        self.watcher.watch_branch(dir, [camera for camera, _ in cameras])
 
-    def print_path(self, index):
-        path = file_model.fileInfo(index).absoluteFilePath()
-        if os.path.isdir(path):
-            if self.stackedWidget.currentIndex() == 1:
-                self.stackedWidget.setCurrentIndex(0)
-                if self.mediaplayer.is_playing():
-                    self.mediaplayer.pause()
-                    self.playbutton.setIcon(self.play_icon)
-                    self.is_paused = True
-                    self.timer.stop()
-            try:
-                if self.generate_thread.isRunning():
-                    self.generate_thread.terminate()
-            except:
-                pass
-            thumb_dir = self.temp_dir
-            self.generate_thread = ThumbnailThread(path,thumb_dir)
-            self.generate_thread.update_widget.connect(self.update_widget)
-            self.generate_thread.started.connect(self.block_thread_signal)
-            self.generate_thread.finished.connect(self.release_thread_signal)
-            self.generate_thread.start()
-                
+    def apply_date_filter(self):
+        """Show only the open camera's segments overlapping the selected
+        range, found by binary search in its time index."""
+        if self.list_dir is None:
             return
-        if self.stackedWidget.currentIndex() == 0:
-            self.stackedWidget.setCurrentIndex(1)
-        
-        # path_folder = os.path.dirname(path)
-        # self.media_list = generate_media_list(path_folder, path)
-        # self.media = self.instance.media_new(path)
-        # self.mediaplayer.set_media(self.media)
-        # self.mediaplayer.set_hwnd(int(self.player_frame.winId()))
-        # self.media.parse()
-        # self.video_label.setText(f"<h1>{self.media.get_meta(0)}</h1>")
-        # self.play_pause()
-        # try:
-        #     if self.generate_thread.isRunning():
-        #         self.generate_thread.terminate()
-        # except:
-        #     pass
-        # thumb_dir = self.temp_dir
-        
-        # self.generate_thread = ListThumbnailThread(path_folder,thumb_dir)
-        # self.generate_thread.update_list_label.connect(self.update_list_label)
-        # self.generate_thread.start()
-    
+        start = QDateTime(self.date_range.date(), self.time_from.time()).toSecsSinceEpoch()
+        end = QDateTime(self.date_range_to.date(), self.time_to.time()).toSecsSinceEpoch() + 60
+        if end <= start:
+            return
+        self.date_filter = (start, end)
+        # the catalog as it stands, the folder watcher keeps it current
+        index = self.catalog.time_index(self.list_dir)
+        self.timeline.set_index(index, (start, end))
+        videos = index.between(start, end)[::-1]
+        self.list_token.cancel()
+        self.list_token = CancelToken(next(self.generations))
+        self.list_model.reset(
+            self.list_token, [(video, os.path.basename(video)) for video in videos]
+        )
+        # carry on from the playing segment rather than the newest in range
+        if self.current_path in videos:
+            videos = videos[videos.index(self.current_path) + 1:]
+        self.playback.set_list(videos)
+
+    def clear_date_filter(self):
+        if self.date_filter is None or self.list_dir is None:
+            self.date_filter = None
+            return
+        self.date_filter = None
+        self.list_token.cancel()
+        self.list_token = CancelToken(next(self.generations))
+        self.list_model.reset(self.list_token)
+        self.list_thread = ListThumbnailThread(self.list_dir, self.list_token, self.catalog)
+        self.list_thread.update_list_label.connect(self.update_list_label)
+        self.list_thread.start()
+
+    def in_date_filter(self, ctime):
+        return self.date_filter is None or self.date_filter[0] <= ctime < self.date_filter[1]
+
+    def recordings_added(self, camera, videos):
+        # the watcher already stat'ed them, no disk access here
+        videos = [video for video, ctime in videos if self.in_date_filter(ctime)]
+        if camera == self.list_dir:
+            # newest first, so fresh segments go on top
+            self.list_model.insert(0, [(video, os.path.basename(video)) for video in videos])
+            self.timeline.set_index(self.catalog.time_index(camera), self.timeline.window)
+        self.grid_model.refresh_thumbnail(camera)
+
+    def recordings_removed(self, camera, videos):
+        if camera == self.list_dir:
+            self.list_model.remove(videos)
+            self.timeline.set_index(self.catalog.time_index(camera), self.timeline.window)
+        self.grid_model.refresh_thumbnail(camera)
+
+    def cameras_changed(self, branch, folders):
+        if branch != self.watcher.branch:
+            return
+        known = set(self.grid_model.paths())
+        gone = [
+            camera for camera in known
+            if camera not in folders and camera != os.path.normcase(branch)
+        ]
+        self.grid_model.remove(gone)
+        self.grid_model.insert(self.grid_model.rowCount(), [
+            (camera, os.path.basename(camera)) for camera in sorted(folders) if camera not in known
+        ])
+        self.watcher.watch_branch(branch, self.grid_model.paths())
+        self.tree_model.refresh(branch)
+        if self.branch_index is not None:
+            for camera in gone:
+                self.branch_index.remove(camera)
+            for camera in folders:
+                self.branch_index.add(camera)
+
+    def toggle_metrics_overlay(self, shown):
+        if shown:
+            self.refresh_metrics_overlay()
+            self.metrics_overlay.show()
+            self.metrics_overlay.raise_()
+            self.metrics_timer.start()
+        else:
+            self.metrics_timer.stop()
+            self.metrics_overlay.hide()
+
+    def refresh_metrics_overlay(self):
+        self.metrics_overlay.setText(metrics.report())
+        self.metrics_overlay.adjustSize()
+        self.metrics_overlay.move(10, self.menuBar().height() + 40)
+
+    def export_metrics(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, 'Export metrics', 'metrics.json', 'JSON (*.json);;CSV (*.csv)'
+        )
+        if path:
+            metrics.dump(path)
+
+    def export_clip_dialog(self):
+        """Ask for a range of the open camera, or the one selected in the
+        grid, and queue its export."""
+        camera = self.list_dir if self.stackedWidget.currentIndex() == 1 else None
+        if camera is None:
+            selected = self.mainframe.selectionModel().selectedIndexes()
+            camera = self.grid_model.path(selected[0].row()) if selected else self.list_dir
+        if camera is None:
+            self.statusBar().showMessage("Open or select a camera to export from", 5000)
+            return
+        if self.date_filter is not None:
+            start, end = self.date_filter
+        elif self.timeline.cursor is not None and camera == self.list_dir:
+            start, end = self.timeline.cursor - 300, self.timeline.cursor + 300
+        else:
+            end = time.time()
+            start = end - 3600
+        newest = self.catalog.newest(camera)
+        extension = os.path.splitext(newest)[1] if newest else '.mp4'
+        out_filename = os.path.join(os.path.expanduser('~'), '{}_{}{}'.format(
+            os.path.basename(camera),
+            QDateTime.fromSecsSinceEpoch(int(start)).toString('yyyyMMdd_hhmmss'), extension
+        ))
+        dialog = ExportDialog(camera, start, end, out_filename, self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        start, end = dialog.range()
+        job = self.exports.submit(camera, start, end, dialog.path())
+        item = QListWidgetItem(f"{os.path.basename(dialog.path())}: queued")
+        item.setData(Qt.ItemDataRole.UserRole, job)
+        self.export_list.addItem(item)
+        self.export_items[job] = (item, os.path.basename(dialog.path()))
+        self.export_dock.show()
+
+    def export_progress(self, job, fraction):
+        if job in self.export_items:
+            item, name = self.export_items[job]
+            item.setText(f"{name}: {fraction:.0%}")
+
+    def export_finished(self, job, path):
+        if job in self.export_items:
+            item, name = self.export_items.pop(job)
+            item.setText(f"{name}: done")
+            item.setToolTip(path)
+
+    def export_failed(self, job, reason):
+        if job in self.export_items:
+            item, name = self.export_items.pop(job)
+            item.setText(f"{name}: {reason}")
+
+    def cancel_export(self):
+        for item in self.export_list.selectedItems():
+            self.exports.cancel(item.data(Qt.ItemDataRole.UserRole))
+
+    def select_tree_index(self, index):
+        self.fileview.setCurrentIndex(index)
+        self.fileview.scrollTo(index)
+
+    def save_session(self):
+        root = self.tree_model.root
+        session = {
+            'root': root.path if root is not None else None,
+            'folder': self.cur_dir,
+            'cameras': [[path, os.path.basename(path)] for path in self.grid_model.paths()],
+            'thumbnails': self.grid_model.thumbnails(),
+        }
+        temp = f'{SESSION_PATH}.tmp'
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(session, f)
+            os.replace(temp, SESSION_PATH)
+        except OSError:
+            pass
+
+    def restore_session(self):
+        """Show the root, folder and camera grid of the last session right
+        away; the tree, the grid and the thumbnails are then checked against
+        the disk in the background."""
+        try:
+            with open(SESSION_PATH, encoding='utf-8') as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return
+        root = session.get('root')
+        if root:
+            self.tree_model.set_root(root)
+            self.build_branch_index(root)
+        folder = session.get('folder')
+        if folder:
+            thumbnails = session.get('thumbnails') or {}
+            # thumbnails are in the local cache, unless it was cleared since
+            self.scan_branch(
+                folder, [tuple(row) for row in session.get('cameras') or ()],
+                {path: thumb for path, thumb in thumbnails.items() if os.path.exists(thumb)}
+            )
+            self.tree_model.reveal(folder)
+
+    def closeEvent(self, event):
+        self.save_session()
+        self.mosaic.release_tiles()
+        self.storyboard_token.cancel()
+        self.watcher.stop()
+        self.index_token.cancel()
+        self.grid_token.cancel()
+        self.list_token.cancel()
+        self.metadata_token.cancel()
+        self.thumbnail_pool.shutdown()
+        self.tree_model.shutdown()
+        self.exports.shutdown()
+        super().closeEvent(event)
+
+    def print_path(self, index):
+        self.open_folder(self.tree_model.path(index))
+
+    def open_folder(self, path):
+        """Show the cameras of ``path`` in the grid. Tree nodes and search
+        hits are always folders, so the disk is not asked here."""
+        if self.stackedWidget.currentIndex() == 2:
+            self.mosaic.close_mosaic()
+        if self.stackedWidget.currentIndex() == 1:
+            self.stackedWidget.setCurrentIndex(0)
+            if self.is_playing:
+                self.mediaplayer.pause()
+                self.playbutton.setIcon(self.play_icon)
+                self.is_paused = True
+        self.scan_branch(path)
+
+    def cycle_rate(self):
+        """Step to the next review speed, back to 1x after the fastest."""
+        rates = REVIEW_RATES
+        current = self.playback.rate
+        faster = [rate for rate in rates if rate > current]
+        self.set_review_rate(faster[0] if faster else rates[0])
+
+    def set_review_rate(self, rate):
+        if self.playback.set_rate(rate) and self.current_path is not None:
+            # the decoder options are fixed per media, reopen where we are
+            offset = max(self.mediaplayer.get_time(), 0) / 1000
+            playing = self.is_playing
+            self.media = self.playback.open(self.current_path, offset)
+            if playing:
+                self.mediaplayer.play()
+            self.mediaplayer.set_rate(rate)
+        self.ratebutton.setText(f"{rate:g}x")
+
     def rewind(self):
-        self.timer.stop()
         cur = self.mediaplayer.get_position()
-        self.mediaplayer.set_position(cur - 0.013)
-        self.timer.start()
+        self.seek_started = time.perf_counter()
+        self.mediaplayer.set_position(max(cur - 0.013, 0.0))
     
     def fast_forward(self):
-        self.timer.stop()
         cur = self.mediaplayer.get_position()
-        self.mediaplayer.set_position(cur + 0.023)
-        self.timer.start()
+        self.seek_started = time.perf_counter()
+        self.mediaplayer.set_position(min(cur + 0.023, 1.0))
     
     def set_position(self):
         """Set the movie position according to the position slider.
@@ -942,14 +4205,38 @@ class MainWindow(QtWidgets.QMainWindow):
         # integer variables, so you need a factor; the higher the factor, the
         # more precise are the results (1000 should suffice).
 
-        # Set the media position to where the slider was dragged
-        self.timer.stop()
-        self.mediaplayer.pause()
+        # Set the media position to where the slider was dragged, libvlc
+        # seeks asynchronously and reports the new position when it is done
         pos = self.positionSlider.value()
+        self.seek_started = time.perf_counter()
         self.mediaplayer.set_position(pos / 1000.0)
-        sleep(0.5)
+
+    def seek_to(self, t):
+        """Play the open camera from the wall clock time ``t``: the
+        recording covering it is found by binary search and opened already
+        seeked to the right offset."""
+        if self.list_dir is None:
+            return
+        # the list thread filled the catalog when the camera was opened and
+        # the folder watcher keeps it current, so no disk access here
+        index = self.catalog.time_index(self.list_dir)
+        position = index.locate(t)
+        offset = 0.0
+        if position is None:
+            # nothing was recorded then, carry on with the next recording
+            position = bisect_left(index.starts, t)
+            if position >= len(index):
+                self.statusBar().showMessage("No recording at or after this time", 5000)
+                return
+        else:
+            offset = t - index.starts[position]
+        path = index.paths[position]
+        self.media = self.playback.open(path, offset)
+        self.load_storyboard(path)
+        self.mediaplayer.set_hwnd(int(self.player_frame.winId()))
+        self.playback.set_list(index.paths[position + 1:])
         self.mediaplayer.play()
-        self.timer.start()
+        self.timeline.set_cursor(index.starts[position] + offset)
 
     def stop(self):
         """Stop player
@@ -958,29 +4245,235 @@ class MainWindow(QtWidgets.QMainWindow):
         self.playbutton.setIcon(self.play_icon)
 
 
-    def update_ui(self):
-        media_pos = int(self.mediaplayer.get_position() * 1000)
-        self.positionSlider.setValue(media_pos)
-        if not self.mediaplayer.is_playing():
-            #self.timer.stop()
+    def segment_started(self, path):
+        """The playback queue switched to the next segment."""
+        self.media = self.mediaplayer.get_media()
+        self.playbutton.setIcon(self.pause_icon)
+        self.is_paused = False
+        self.load_storyboard(path)
+
+    def load_storyboard(self, path):
+        """Render or load the storyboard of the recording now playing."""
+        self.current_path = path
+        self.storyboard = None
+        self.storyboard_popup.hide()
+        self.storyboard_token.cancel()
+        self.storyboard_token = CancelToken(next(self.generations))
+        token = self.storyboard_token
+        metadata = self.catalog.metadata(path)
+        # where the recording sits on the camera's timeline
+        self.current_start = metadata[0] if metadata else None
+        if metadata and metadata[2]:
+            self.current_length = metadata[2]
+        elif self.timeline.index is not None:
+            self.current_length = self.timeline.index.typical_duration()
+        self.thumbnail_pool.submit_job(
+            partial(generate_storyboard, path, self.thumbnail_cache, token,
+                    metadata[2] if metadata else None),
+            lambda result: self.storyboard_ready.emit(path, result, token.generation),
+            token
+        )
+        self.activity = b''
+        self.positionSlider.set_activity(b'')
+        self.thumbnail_pool.submit_job(
+            partial(generate_activity, path, self.thumbnail_cache, token),
+            lambda result: self.activity_ready.emit(path, result, token.generation),
+            token
+        )
+
+    def set_storyboard(self, path, result, generation):
+        if generation != self.storyboard_token.generation or result is None:
+            return
+        sprite, index = result
+        self.storyboard = (QPixmap(sprite), index)
+
+    def set_activity(self, path, scores, generation):
+        if generation != self.storyboard_token.generation or scores is None:
+            return
+        self.activity = scores
+        self.positionSlider.set_activity(scores)
+
+    def jump_to_next_event(self):
+        if not self.activity:
+            self.statusBar().showMessage("No activity index for this recording yet", 5000)
+            return
+        # the player's own length once known, else the index's, which holds
+        # one score per second; the catalog may still have to probe the clip
+        length = self.mediaplayer.get_length() / 1000
+        if length <= 0:
+            length = len(self.activity)
+        second = next_event(self.activity, self.mediaplayer.get_position() * length)
+        if second is None:
+            self.statusBar().showMessage("No more activity in this recording", 5000)
+            return
+        self.seek_started = time.perf_counter()
+        self.mediaplayer.set_position(min(second / length, 1.0))
+
+    def show_storyboard_frame(self, value, pos):
+        if self.storyboard is None:
+            return
+        sprite, index = self.storyboard
+        fraction = (value - self.positionSlider.minimum()) / max(
+            self.positionSlider.maximum() - self.positionSlider.minimum(), 1
+        )
+        frame = storyboard_frame(sprite, index, fraction)
+        self.storyboard_popup.setPixmap(frame)
+        self.storyboard_popup.resize(frame.size())
+        self.storyboard_popup.move(pos - QPoint(frame.width() // 2, frame.height() + 20))
+        self.storyboard_popup.show()
+
+    def set_current_length(self, seconds):
+        """libvlc knows the playing clip's length, the catalog's duration
+        may have been a guess."""
+        self.current_length = seconds
+
+    def update_ui(self, position):
+        if self.seek_started is not None:
+            # first position report after a seek, the seek has landed
+            metrics.observe('player.seek', time.perf_counter() - self.seek_started)
+            self.seek_started = None
+        if self.positionSlider.isSliderDown():
+            # the operator is dragging, don't pull the handle away
+            return
+        media_pos = int(position * 1000)
+        if media_pos != self.positionSlider.value():
+            self.positionSlider.setValue(media_pos)
+        if self.current_start is not None:
+            self.timeline.set_cursor(self.current_start + position * self.current_length)
+
+    def player_playing(self):
+        self.is_playing = True
+        self.is_paused = False
+        self.playbutton.setIcon(self.pause_icon)
+
+    def player_paused(self):
+        self.is_playing = False
+        self.is_paused = True
+        self.playbutton.setIcon(self.play_icon)
+
+    def player_stopped(self):
+        self.is_playing = False
+        self.playbutton.setIcon(self.play_icon)
+
+    def player_error(self):
+        # skip a segment libvlc cannot play rather than stalling on it
+        self.is_playing = False
+        self.playback.advance()
+
+
+def find_cameras(root):
+    """Yield every folder under ``root`` that holds files, i.e. recordings."""
+    for directory, entries in walk_directories(root):
+        if any(entry.is_file() for entry in entries):
+            yield os.path.normpath(directory)
+
 
-            # After the video finished, the play button stills shows "Pause",
-            # which is not the desired behavior of a media player.
-            # This fixes that "bug".
-            if not self.is_paused:
+def index_recording(catalog, cache, path, token=None, storyboards=False, activity=False):
+    """Probe ``path`` if the catalog has no metadata for it yet and render
+    its thumbnail (and storyboard and activity scores), return whether a
+    thumbnail exists."""
+    metadata = catalog.metadata(path)
+    duration = metadata[2] if metadata else None
+    if metadata is not None and duration is None:
+        duration = catalog.probe(path, token, cache.failures)
+    thumb = generate_thumbnail(path, cache, token=token, duration=duration)
+    if storyboards and thumb is not None:
+        generate_storyboard(path, cache, token, duration)
+    if activity and thumb is not None:
+        generate_activity(path, cache, token)
+    return thumb is not None
+
+
+def index_tree(root, jobs=THUMBNAIL_WORKERS, newest_only=False, storyboards=False,
+               activity=False, report_every=5.0, out=sys.stderr):
+    """Fill the catalog and the thumbnail cache for every camera under
+    ``root``, newest recordings first so the grid warms up before the
+    strips. Work already in the cache is skipped, so an interrupted run just
+    picks up where it stopped. Returns ``(done, failed, seconds)``."""
+    catalog = RecordingCatalog()
+    cache = ThumbnailCache(THUMBNAIL_CACHE_DIR)
+    token = CancelToken()
+    started = time.perf_counter()
+    cameras = list(find_cameras(root))
+    with ThreadPoolExecutor(max_workers=SCAN_CONCURRENCY_PER_MOUNT) as scanner:
+        list(scanner.map(catalog.refresh, cameras))
+    # grid thumbnails (newest recording of each camera) first, then the rest
+    work = [path for path in (catalog.newest(camera) for camera in cameras) if path]
+    if not newest_only:
+        first = set(work)
+        for camera in cameras:
+            work.extend(path for path in catalog.recordings(camera) if path not in first)
+    print(f'{len(cameras)} cameras, {len(work)} recordings to index with {jobs} workers',
+          file=out)
+    done = failed = 0
+    last_report = started
+    executor = ThreadPoolExecutor(max_workers=max(1, jobs), thread_name_prefix='index')
+    pending = set()
+    queue = iter(work)
+    try:
+        while True:
+            # keep a bounded window of jobs in flight, trees can be huge
+            for path in itertools.islice(queue, max(1, jobs) * 4 - len(pending)):
+                pending.add(executor.submit(
+                    index_recording, catalog, cache, path, token, storyboards, activity
+                ))
+            if not pending:
+                break
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done += 1
                 try:
-                    self.media = self.instance.media_new(self.media_list.__next__())
-                    self.mediaplayer.set_media(self.media)
-                    self.mediaplayer.set_hwnd(int(self.player_frame.winId()))
-                    self.media.parse()
-                    #self.video_label.setText(f"<h1>{self.media.get_meta(0)}</h1>")
-                    self.play_pause()
-                except StopIteration:
-                    self.stop()
+                    indexed = future.result()
+                except Exception as e:  # pylint: disable=broad-except
+                    # one bad recording must not end a run over the tree
+                    print(f'{type(e).__name__}: {e}', file=out)
+                    indexed = False
+                if not indexed:
+                    failed += 1
+            now = time.perf_counter()
+            if now - last_report >= report_every:
+                last_report = now
+                print(f'{done}/{len(work)} recordings, {done / (now - started):.1f}/s, '
+                      f'{failed} failed', file=out)
+    except KeyboardInterrupt:
+        token.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        print(f'interrupted after {done} recordings, run again to resume', file=out)
+        raise
+    executor.shutdown()
+    seconds = time.perf_counter() - started
+    print(f'indexed {done} recordings in {seconds:.1f}s '
+          f'({done / max(seconds, 1e-9):.1f}/s), {failed} failed', file=out)
+    return done, failed, seconds
 
 
-if __name__ == '__main__':
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Remote CAM Controller')
+    commands = parser.add_subparsers(dest='command')
+    index = commands.add_parser(
+        'index', help='fill the thumbnail cache and recording metadata without the GUI'
+    )
+    index.add_argument('root', help='camera root folder to walk')
+    index.add_argument('--jobs', '-j', type=int, default=THUMBNAIL_WORKERS,
+                       help='parallel workers (default: %(default)s)')
+    index.add_argument('--newest-only', action='store_true',
+                       help="only the recording each camera's grid thumbnail comes from")
+    index.add_argument('--storyboards', action='store_true',
+                       help='also render the seek preview storyboards')
+    index.add_argument('--activity', action='store_true',
+                       help='also analyse the recordings for activity')
+    args = parser.parse_args(argv)
+    if args.command == 'index':
+        try:
+            index_tree(args.root, args.jobs, args.newest_only, args.storyboards, args.activity)
+        except KeyboardInterrupt:
+            return 130
+        return 0
     app = QtWidgets.QApplication([])
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+
+if __name__ == '__main__':
+    sys.exit(main())